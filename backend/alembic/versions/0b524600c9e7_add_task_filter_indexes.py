@@ -0,0 +1,42 @@
+"""Add indexes for the hot task filter paths
+
+Revision ID: 0b524600c9e7
+Revises: 0e3b5f017fc3
+Create Date: 2026-10-18 09:12:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b524600c9e7'
+down_revision = '0e3b5f017fc3'
+branch_labels = None
+depends_on = None
+
+
+# (nombre, definición) de cada índice sobre tasks. Los valores del enum
+# taskstatus en PostgreSQL son los nombres de los miembros (PENDIENTE, ...)
+TASK_INDEXES = [
+    ("ix_tasks_client_id_status", "(client_id, status)"),
+    ("ix_tasks_assigned_to_status", "(assigned_to, status)"),
+    ("ix_tasks_open_due_date", "(due_date) WHERE status IN ('PENDIENTE', 'EN_PROGRESO')"),
+    ("ix_tasks_created_at_id", "(created_at, id)"),
+    ("ix_tasks_due_date_id", "(due_date, id)"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY evita bloquear escrituras sobre tasks mientras se crean los
+    # índices; no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, definition in TASK_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON tasks {definition}")
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(TASK_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,58 @@
+"""Add full-text search vector to tasks
+
+Revision ID: 3f7a9c1e2d58
+Revises: 8d1f3c2a6b47
+Create Date: 2026-10-18 13:27:10.284915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7a9c1e2d58'
+down_revision = '8d1f3c2a6b47'
+branch_labels = None
+depends_on = None
+
+
+# Título (peso A), descripción (B) y valores de texto de custom_fields (C)
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('es_unaccent'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('es_unaccent'::regconfig, coalesce(description, '')), 'B') ||
+    setweight(jsonb_to_tsvector('es_unaccent'::regconfig, coalesce(custom_fields, '{}'::jsonb), '["string"]'), 'C')
+"""
+
+
+def upgrade() -> None:
+    # Configuración en español que ignora tildes: "capacitacion" encuentra "Capacitación"
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+                ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            END IF;
+        END
+        $$
+    """)
+    # Columna generada: PostgreSQL la recalcula en cada INSERT/UPDATE de la fila
+    op.execute(
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_search_vector "
+            "ON tasks USING gin (search_vector)"
+        )
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_search_vector")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent")
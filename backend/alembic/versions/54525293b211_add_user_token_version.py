@@ -0,0 +1,25 @@
+"""Add token_version to users
+
+Revision ID: 54525293b211
+Revises: 0b524600c9e7
+Create Date: 2026-10-18 10:41:07.902615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '54525293b211'
+down_revision = '0b524600c9e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: la columna puede existir ya si la tabla se creó con create_all
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
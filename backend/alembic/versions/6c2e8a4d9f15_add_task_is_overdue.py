@@ -0,0 +1,49 @@
+"""Add precomputed is_overdue flag to tasks
+
+Revision ID: 6c2e8a4d9f15
+Revises: 3f7a9c1e2d58
+Create Date: 2026-10-18 16:42:37.519204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2e8a4d9f15'
+down_revision = '3f7a9c1e2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Marca mantenida por el job de vencidas (app/overdue.py) y por las escrituras de tareas.
+    # IF NOT EXISTS: la columna puede existir ya si la tabla se creó con create_all
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS is_overdue BOOLEAN NOT NULL DEFAULT false")
+    op.execute(
+        "UPDATE tasks SET is_overdue = true "
+        "WHERE status IN ('PENDIENTE', 'EN_PROGRESO') AND due_date < now()"
+    )
+    with op.get_context().autocommit_block():
+        # Tareas abiertas aún no marcadas: lo único que el job recorre en cada ejecución
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_pending_overdue ON tasks (due_date) "
+            "WHERE status IN ('PENDIENTE', 'EN_PROGRESO') AND NOT is_overdue"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_overdue ON tasks (client_id, assigned_to) "
+            "WHERE is_overdue"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_open_due_date")
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_open_due_date ON tasks (due_date) "
+            "WHERE status IN ('PENDIENTE', 'EN_PROGRESO')"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_overdue")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_pending_overdue")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS is_overdue")
@@ -0,0 +1,34 @@
+"""Store task custom_fields as jsonb and index them with GIN
+
+Revision ID: 8d1f3c2a6b47
+Revises: 54525293b211
+Create Date: 2026-10-18 12:05:44.610392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d1f3c2a6b47'
+down_revision = '54525293b211'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # json no admite índices GIN ni el operador @>; la conversión reescribe la tabla
+    op.execute("ALTER TABLE tasks ALTER COLUMN custom_fields TYPE jsonb USING custom_fields::jsonb")
+    # jsonb_path_ops: índice más pequeño, suficiente para los filtros por containment (@>)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_custom_fields "
+            "ON tasks USING gin (custom_fields jsonb_path_ops)"
+        )
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_custom_fields")
+    op.execute("ALTER TABLE tasks ALTER COLUMN custom_fields TYPE json USING custom_fields::json")
@@ -0,0 +1,31 @@
+"""Add open-task due date index per assignee
+
+Revision ID: a41d7e3b5c62
+Revises: 6c2e8a4d9f15
+Create Date: 2026-10-18 18:05:12.736481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41d7e3b5c62'
+down_revision = '6c2e8a4d9f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Buckets de GET /tasks/due: tareas abiertas de cada asesor en orden de vencimiento
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_assigned_to_open_due_date "
+            "ON tasks (assigned_to, due_date) WHERE status IN ('PENDIENTE', 'EN_PROGRESO')"
+        )
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_assigned_to_open_due_date")
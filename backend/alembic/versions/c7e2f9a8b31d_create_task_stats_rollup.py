@@ -0,0 +1,51 @@
+"""Create task_stats_rollup with a null-safe unique key
+
+Revision ID: c7e2f9a8b31d
+Revises: a41d7e3b5c62
+Create Date: 2026-10-18 19:24:48.105362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2f9a8b31d'
+down_revision = 'a41d7e3b5c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: la tabla puede existir ya si se creó con create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS task_stats_rollup (
+            id SERIAL PRIMARY KEY,
+            client_id INTEGER NOT NULL,
+            assigned_to INTEGER,
+            status taskstatus,
+            task_count INTEGER NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_task_stats_rollup_id ON task_stats_rollup (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_task_stats_rollup_client_id ON task_stats_rollup (client_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_task_stats_rollup_assigned_to ON task_stats_rollup (assigned_to)")
+
+    # Con la restricción anterior (NULL distintos) pudo haber filas duplicadas para las tareas
+    # sin asignar: se reconstruye el rollup desde tasks bloqueando las escrituras sobre tasks
+    op.execute("ALTER TABLE task_stats_rollup DROP CONSTRAINT IF EXISTS uq_task_stats_rollup_key")
+    op.execute("LOCK TABLE tasks IN SHARE MODE")
+    op.execute("DELETE FROM task_stats_rollup")
+    op.execute("""
+        INSERT INTO task_stats_rollup (client_id, assigned_to, status, task_count)
+        SELECT client_id, assigned_to, status, count(*) FROM tasks
+        GROUP BY client_id, assigned_to, status
+    """)
+    op.execute(
+        "ALTER TABLE task_stats_rollup ADD CONSTRAINT uq_task_stats_rollup_key "
+        "UNIQUE NULLS NOT DISTINCT (client_id, assigned_to, status)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS task_stats_rollup")
@@ -1,12 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import threading
+import time
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.cache import TTLCache
+from app.hashing import hash_password, verify_and_update
 from app.database import get_db
-from app.models import User
+from app.models import User, UserRole
 from app.schemas import TokenData
 import os
 
@@ -16,32 +23,183 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica una contraseña usando bcrypt directamente"""
+# Caché en memoria del proceso de los usuarios autenticados: evita consultar
+# users en cada petición. Cada worker tiene su propia caché, por lo que un
+# cambio hecho en otro worker se refleja como máximo tras USER_CACHE_TTL_SECONDS
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# Columnas que se guardan en caché (nunca el hash de la contraseña)
+CACHED_USER_COLUMNS = [
+    column.key for column in User.__table__.columns if column.key != "hashed_password"
+]
+
+# Modo de claims: el token incluye id, rol y cliente del usuario y la autorización
+# se resuelve sin leer users; solo se valida la versión del token (revocación)
+# contra una caché de (token_version, is_active) por usuario
+AUTH_STATELESS_CLAIMS = os.getenv("AUTH_STATELESS_CLAIMS", "false").lower() == "true"
+TOKEN_REVOCATION_TTL_SECONDS = float(os.getenv("TOKEN_REVOCATION_TTL_SECONDS", "30"))
+token_version_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=TOKEN_REVOCATION_TTL_SECONDS)
+
+def verify_password_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica una contraseña con el esquema de su hash; retorna también el nuevo hash si debe actualizarse"""
     try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            hashed_password.encode('utf-8')
-        )
+        return verify_and_update(plain_password, hashed_password)
     except Exception as e:
         print(f"Error verificando contraseña: {e}")
-        return False
+        return False, None
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica una contraseña detectando el esquema del hash (bcrypt, argon2 o sha256 heredado)"""
+    return verify_password_and_update(plain_password, hashed_password)[0]
+
+# Pool dedicado para verificar contraseñas: bcrypt tarda ~250ms por intento y
+# bloquearía el event loop. El número de hilos limita cuántas verificaciones
+# corren a la vez y PASSWORD_VERIFY_MAX_PENDING cuántas pueden esperar en cola
+PASSWORD_VERIFY_WORKERS = int(os.getenv("PASSWORD_VERIFY_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_VERIFY_MAX_PENDING = int(os.getenv("PASSWORD_VERIFY_MAX_PENDING", "64"))
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_VERIFY_WORKERS, thread_name_prefix="password-verify"
+)
+
+class PasswordVerifyMetrics:
+    """Contadores de la cola de verificación de contraseñas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def record(self, queue_seconds: float, run_seconds: float):
+        with self._lock:
+            self.completed += 1
+            self.total_queue_seconds += queue_seconds
+            self.max_queue_seconds = max(self.max_queue_seconds, queue_seconds)
+            self.total_run_seconds += run_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": PASSWORD_VERIFY_WORKERS,
+                "max_pending": PASSWORD_VERIFY_MAX_PENDING,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_queue_ms": self.total_queue_seconds / self.completed * 1000 if self.completed else 0.0,
+                "max_queue_ms": self.max_queue_seconds * 1000,
+                "avg_run_ms": self.total_run_seconds / self.completed * 1000 if self.completed else 0.0,
+            }
+
+password_verify_metrics = PasswordVerifyMetrics()
+
+def _timed_verify_password(plain_password: str, hashed_password: str, submitted_at: float):
+    started_at = time.perf_counter()
+    result = verify_password_and_update(plain_password, hashed_password)
+    password_verify_metrics.record(started_at - submitted_at, time.perf_counter() - started_at)
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica la contraseña en el pool dedicado sin bloquear el event loop; retorna (válida, hash nuevo)"""
+    if password_verify_metrics.pending >= PASSWORD_VERIFY_MAX_PENDING:
+        password_verify_metrics.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    password_verify_metrics.pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            password_executor, _timed_verify_password, plain_password, hashed_password, time.perf_counter()
+        )
+    finally:
+        password_verify_metrics.pending -= 1
 
 def get_password_hash(password: str) -> str:
-    """Genera un hash de contraseña usando bcrypt directamente"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Genera un hash de contraseña con el esquema y costo configurados"""
+    return hash_password(password)
 
 def get_user(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+def get_cached_user(db: Session, username: str, token_version: int = 0) -> Optional[User]:
+    """Obtiene el usuario desde la caché (clave: username + versión del token) o desde la base de datos"""
+    entry = user_cache.get(username)
+    if entry is not None and entry[0] == token_version:
+        # Reconstruir la instancia y asociarla a la sesión sin emitir SQL
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
     user = get_user(db, username)
+    if user is not None:
+        values = {key: getattr(user, key) for key in CACHED_USER_COLUMNS}
+        user_cache.set(username, (token_version, values))
+    return user
+
+def invalidate_cached_user(username: str, user_id: Optional[int] = None):
+    """Elimina al usuario de la caché de autenticación"""
+    user_cache.invalidate(username)
+    if user_id is not None:
+        token_version_cache.invalidate(user_id)
+
+def build_token_claims(user: User) -> dict:
+    """Claims del token de acceso; en modo de claims incluye lo necesario para autorizar"""
+    claims = {"sub": user.username, "ver": user.token_version}
+    if AUTH_STATELESS_CLAIMS:
+        claims.update({
+            "uid": user.id,
+            "role": UserRole(user.role).value,
+            "cid": user.client_id,
+        })
+    return claims
+
+def get_token_state(db: Session, user_id: int):
+    """Retorna (token_version, is_active) del usuario desde la caché o con una consulta mínima"""
+    state = token_version_cache.get(user_id)
+    if state is None:
+        row = db.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        state = (row.token_version, row.is_active)
+        token_version_cache.set(user_id, state)
+    return state
+
+def get_user_from_claims(db: Session, payload: dict, token_version: int) -> Optional[User]:
+    """Construye el usuario autenticado a partir de los claims del token, sin leer users"""
+    state = get_token_state(db, int(payload["uid"]))
+    if state is None or state[0] != token_version:
+        return None
+    user = User(
+        id=int(payload["uid"]),
+        username=payload["sub"],
+        role=UserRole(payload["role"]),
+        client_id=payload.get("cid"),
+        is_active=state[1],
+        token_version=token_version
+    )
+    # Los demás atributos (email, full_name, ...) se cargan solo si se usan
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    """Autentica al usuario; la verificación de la contraseña corre fuera del event loop"""
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    is_valid, new_hash = await verify_password_async(password, user.hashed_password)
+    if not is_valid:
         return None
+    # Migración transparente del hash al esquema/costo configurado
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -54,7 +212,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Función síncrona a propósito: en caso de fallo de caché consulta la base de datos
+# con la sesión síncrona, y FastAPI la ejecuta en el threadpool sin bloquear el event loop
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -66,9 +226,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
-    except JWTError:
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, ValueError, TypeError):
         raise credentials_exception
-    user = get_user(db, username=token_data.username)
+    
+    if AUTH_STATELESS_CLAIMS and "uid" in payload:
+        try:
+            user = get_user_from_claims(db, payload, token_version)
+        except (KeyError, ValueError, TypeError):
+            raise credentials_exception
+    else:
+        user = get_cached_user(db, token_data.username, token_version)
+        # Un token emitido antes de un cambio de versión queda revocado
+        if user is not None and user.token_version != token_version:
+            user = None
     if user is None:
         raise credentials_exception
     return user
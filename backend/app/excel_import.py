@@ -0,0 +1,208 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.models import Client, User, Task, TaskStatus, TaskPriority
+from app.json_import import COPY_OPTIONS, copy_buffer
+
+# Normalización vectorizada (pandas) de las hojas de Excel de las ARL y escritura
+# masiva de tareas. Compartido por los scripts de importación y de asignación
+
+ACCENTS = str.maketrans("áéíóú", "aeiou")
+
+# Formato DD/MM/YYYY o DD/MM/YY de las columnas de fecha escritas a mano
+DMY_PATTERN = r"^\s*(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})\s*$"
+
+# Caracteres del título que se comparan al buscar la tarea de una fila del Excel
+TITLE_MATCH_LENGTH = 50
+
+def column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Columna de la hoja, o una columna vacía si la hoja no la tiene"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+def _column_values(frame: pd.DataFrame) -> list:
+    # Listas por columna con objetos de Python; más rápido que to_dict("records")
+    return [
+        frame[name].astype(object).where(frame[name].notna(), None).tolist()
+        for name in frame.columns
+    ]
+
+def to_records(frame: pd.DataFrame) -> List[dict]:
+    """Filas como diccionarios, con None en lugar de NaN/NaT"""
+    columns = list(frame.columns)
+    return [dict(zip(columns, row)) for row in zip(*_column_values(frame))]
+
+def as_text(series: pd.Series) -> pd.Series:
+    """Cada valor convertido con str() (las fechas como '2025-09-17 00:00:00'); NaN se mantiene"""
+    return series.astype(object).astype(str).where(series.notna())
+
+def clean_strings(series: pd.Series, max_length: int = 200) -> pd.Series:
+    """Texto sin espacios en los extremos y truncado con '...'; vacíos como None"""
+    values = as_text(series).astype("string").str.strip()
+    values = values.mask(values.isin(["nan", "NaT"]))
+    too_long = (values.str.len() > max_length).fillna(False)
+    values = values.where(~too_long, values.str.slice(0, max_length - 3) + "...")
+    return values.astype(object).where(values.notna(), None)
+
+def clean_dates(series: pd.Series) -> pd.Series:
+    """Fechas de la hoja (DD/MM/YYYY, DD/MM/YY o cualquier formato de pandas); NaT si no son válidas"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    
+    parts = series.astype("string").str.extract(DMY_PATTERN)
+    is_dmy = parts[0].notna()
+    # Años de 2 dígitos: < 50 es 20xx, el resto 19xx
+    day, month, year = [pd.to_numeric(parts[i], errors="coerce").astype(float) for i in range(3)]
+    two_digit_year = (parts[2].str.len() == 2).fillna(False)
+    year = year.mask(two_digit_year, np.where(year < 50, 2000 + year, 1900 + year))
+    # Años fuera del rango de pandas (p. ej. '0205' por un error de digitación) quedan como NaT
+    year = year.where(year.between(pd.Timestamp.min.year + 1, pd.Timestamp.max.year - 1))
+    dmy_dates = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": month, "day": day}),
+        errors="coerce"
+    )
+    other_dates = pd.to_datetime(series.where(~is_dmy & series.notna()), errors="coerce", format="mixed")
+    return dmy_dates.where(is_dmy, other_dates)
+
+def clean_integers(series: pd.Series) -> pd.Series:
+    """Enteros (truncados) o None"""
+    values = np.trunc(pd.to_numeric(series, errors="coerce")).astype("Int64")
+    return values.astype(object).where(values.notna(), None)
+
+def normalize_usernames(series: pd.Series, suffix: str = "") -> pd.Series:
+    """Username de los asesores: minúsculas, '_' en lugar de espacios y sin tildes"""
+    usernames = series.astype("string").str.lower().str.replace(" ", "_", regex=False).str.translate(ACCENTS)
+    return usernames + suffix
+
+def map_task_status(series: pd.Series) -> pd.Series:
+    """Estado de la tarea a partir de la columna ESTADO de la hoja"""
+    text = series.astype("string").str.lower().fillna("")
+    conditions = [
+        text.str.contains("completada|finalizada|terminada").astype(bool),
+        text.str.contains("en progreso|en proceso|ejecutando").astype(bool),
+        text.str.contains("cancelada|anulada").astype(bool),
+    ]
+    choices = [TaskStatus.COMPLETADA.value, TaskStatus.EN_PROGRESO.value, TaskStatus.CANCELADA.value]
+    values = np.select(conditions, choices, default=TaskStatus.PENDIENTE.value)
+    return pd.Series(values, index=series.index).map(TaskStatus)
+
+def map_task_priority(series: pd.Series) -> pd.Series:
+    """Prioridad según las horas asignadas; valores no numéricos quedan en media"""
+    hours = pd.to_numeric(series, errors="coerce")
+    not_numeric = hours.isna() & series.notna()
+    hours = hours.fillna(0)
+    conditions = [not_numeric, hours >= 100, hours >= 50, hours >= 20]
+    choices = [
+        TaskPriority.MEDIA.value, TaskPriority.CRITICA.value,
+        TaskPriority.ALTA.value, TaskPriority.MEDIA.value,
+    ]
+    values = np.select(conditions, choices, default=TaskPriority.BAJA.value)
+    return pd.Series(values, index=series.index).map(TaskPriority)
+
+def join_labeled(df: pd.DataFrame, parts: list, default: Optional[str] = None) -> pd.Series:
+    """Une las columnas no vacías como líneas 'Etiqueta: valor'"""
+    text = pd.Series("", index=df.index, dtype=object)
+    for label, name in parts:
+        values = column(df, name)
+        piece = (f"{label}: " + as_text(values)).where(values.notna(), "")
+        separator = np.where((text != "") & (piece != ""), "\n", "")
+        text = text + separator + piece
+    return text.where(text != "", default)
+
+def custom_fields_records(fields: Dict[str, pd.Series], drop_empty: bool = True) -> List[dict]:
+    """Un diccionario de campos personalizados por fila"""
+    frame = pd.DataFrame(fields)
+    if not drop_empty:
+        return to_records(frame)
+    columns = list(frame.columns)
+    return [
+        {key: value for key, value in zip(columns, row) if value is not None}
+        for row in zip(*_column_values(frame))
+    ]
+
+def load_client_ids(db: Session, arl_id: int) -> Dict[str, int]:
+    """Id de cada cliente de la ARL por nombre (el de menor id si hay nombres repetidos)"""
+    rows = db.query(Client.name, Client.id).filter(Client.arl_id == arl_id).order_by(Client.id.desc()).all()
+    return dict(rows)
+
+def load_user_ids(db: Session) -> Dict[str, int]:
+    """Id de cada usuario por username"""
+    return dict(db.query(User.username, User.id).all())
+
+def load_task_keys(db: Session, client_ids) -> pd.DataFrame:
+    """Id, título y cliente de las tareas existentes de los clientes dados"""
+    rows = db.execute(
+        select(Task.id, Task.title, Task.client_id)
+        .where(Task.client_id.in_([int(client_id) for client_id in client_ids]))
+        .order_by(Task.id)
+    ).all()
+    return pd.DataFrame(rows, columns=["id", "title", "client_id"]).astype({"id": "int64", "client_id": "int64"})
+
+def match_task_ids(db: Session, client_ids: pd.Series, titles: pd.Series) -> pd.Series:
+    """Id de la tarea de cada fila: mismo cliente y mismos primeros caracteres del título"""
+    tasks = load_task_keys(db, client_ids.dropna().unique())
+    tasks["key"] = tasks["title"].str.slice(0, TITLE_MATCH_LENGTH)
+    tasks = tasks.drop_duplicates(["client_id", "key"])
+    
+    rows = pd.DataFrame({
+        "client_id": client_ids,
+        "key": titles.astype("string").str.slice(0, TITLE_MATCH_LENGTH),
+    })
+    matched = rows.merge(tasks[["client_id", "key", "id"]], on=["client_id", "key"], how="left")
+    return pd.Series(matched["id"].values, index=titles.index)
+
+# Hoja, columna del asesor y sufijo de su username para cada ARL
+ASSIGNMENT_SHEETS = [
+    {"arl": "COLMENA ARL", "file": "Files/Estado de Tareas_COLMENA ARL.xlsx", "advisor": "ASESOR ASIGNADO", "suffix": ""},
+    {"arl": "POSITIVA ARL", "file": "Files/Estado de Tareas_POSITIVA ARL.xlsx", "advisor": "ASESOR", "suffix": "_positiva"},
+]
+
+def resolve_sheet_assignments(db: Session, df: pd.DataFrame, arl_id: int, advisor_column: str, suffix: str = "") -> pd.DataFrame:
+    """Tarea y usuario asesor de cada fila de la hoja (task_id / user_id vacíos si no se encuentran)"""
+    advisors = column(df, advisor_column)
+    df = df[df["EMPRESA"].notna() & df["ACTIVIDAD"].notna() & advisors.notna()]
+    client_ids = df["EMPRESA"].map(load_client_ids(db, arl_id))
+    df = df[client_ids.notna()]
+    client_ids = client_ids[client_ids.notna()].astype(int)
+    
+    usernames = normalize_usernames(df[advisor_column], suffix)
+    return pd.DataFrame({
+        "actividad": df["ACTIVIDAD"].astype(str),
+        "asesor": df[advisor_column],
+        "username": usernames,
+        "task_id": match_task_ids(db, client_ids, df["ACTIVIDAD"]),
+        "user_id": usernames.map(load_user_ids(db)),
+    })
+
+TASK_COPY_COLUMNS = [
+    "title", "description", "status", "priority", "due_date",
+    "client_id", "assigned_to", "created_by", "custom_fields",
+]
+
+def insert_tasks(db: Session, records: List[dict]) -> int:
+    """Inserta las tareas con COPY en PostgreSQL (INSERT masivo en otros motores); no hace commit"""
+    if not records:
+        return 0
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(Task), records)
+        return len(records)
+    
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY tasks ({', '.join(TASK_COPY_COLUMNS)}) FROM STDIN WITH {COPY_OPTIONS}",
+        copy_buffer(records, TASK_COPY_COLUMNS)
+    )
+    return len(records)
+
+def assign_tasks(db: Session, task_ids: pd.Series, user_ids: pd.Series) -> int:
+    """Asigna cada tarea a su usuario con un UPDATE masivo por clave primaria; no hace commit"""
+    rows = [
+        {"id": int(task_id), "assigned_to": int(user_id)}
+        for task_id, user_id in zip(task_ids, user_ids)
+    ]
+    if rows:
+        db.execute(update(Task), rows)
+    return len(rows)
@@ -0,0 +1,125 @@
+import csv
+import io
+import tempfile
+from datetime import datetime, timezone
+import orjson
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from starlette.concurrency import run_in_threadpool
+from app.database import AsyncSessionLocal
+from app.models import Task, Client, User
+from app.serialization import ORJSON_OPTIONS, _enum_value
+
+# Filas leídas por lote del cursor del servidor; la memoria depende de este valor,
+# no del tamaño de la tabla
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+AssignedUser = aliased(User)
+CreatedByUser = aliased(User)
+
+# (columna del archivo, expresión de la consulta)
+EXPORT_COLUMNS = [
+    ("id", Task.id),
+    ("title", Task.title),
+    ("description", Task.description),
+    ("status", Task.status),
+    ("priority", Task.priority),
+    ("due_date", Task.due_date),
+    ("completed_at", Task.completed_at),
+    ("client_id", Task.client_id),
+    ("client_name", Client.name),
+    ("assigned_to", Task.assigned_to),
+    ("assigned_to_name", AssignedUser.full_name),
+    ("created_by", Task.created_by),
+    ("created_by_name", CreatedByUser.full_name),
+    ("custom_fields", Task.custom_fields),
+    ("created_at", Task.created_at),
+    ("updated_at", Task.updated_at),
+]
+EXPORT_HEADERS = [name for name, _ in EXPORT_COLUMNS]
+
+def task_export_query():
+    """Consulta por columnas (sin instancias ORM) con los nombres de cliente y usuarios"""
+    return (
+        select(*[expression.label(name) for name, expression in EXPORT_COLUMNS])
+        .join(Client, Task.client_id == Client.id)
+        .outerjoin(AssignedUser, Task.assigned_to == AssignedUser.id)
+        .join(CreatedByUser, Task.created_by == CreatedByUser.id)
+        .order_by(Task.id)
+    )
+
+async def stream_export_batches(query):
+    """Recorre la consulta con un cursor del servidor y produce lotes de diccionarios"""
+    # Sesión propia: la respuesta se sigue enviando después de que termina el endpoint
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [
+                {name: _enum_value(value) for name, value in row._mapping.items()}
+                for row in partition
+            ]
+
+async def ndjson_chunks(query):
+    async for batch in stream_export_batches(query):
+        yield b"".join(orjson.dumps(row, option=ORJSON_OPTIONS) + b"\n" for row in batch)
+
+def _csv_value(value):
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode("utf-8")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def csv_chunks(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8 (tildes y eñes)
+    buffer.write("﻿")
+    writer.writerow(EXPORT_HEADERS)
+    async for batch in stream_export_batches(query):
+        writer.writerows([_csv_value(row[name]) for name in EXPORT_HEADERS] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def _xlsx_value(value):
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode("utf-8")
+    # Excel no admite zonas horarias: se exporta en UTC
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+async def xlsx_chunks(query, chunk_size: int = 64 * 1024):
+    # xlsx es un zip que solo se puede cerrar al final: openpyxl en modo write_only
+    # escribe las filas a disco a medida que llegan y el archivo se envía al terminar
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("tasks")
+    sheet.append(EXPORT_HEADERS)
+    async for batch in stream_export_batches(query):
+        for row in batch:
+            sheet.append([_xlsx_value(row[name]) for name in EXPORT_HEADERS])
+    
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while True:
+            chunk = await run_in_threadpool(output.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+EXPORT_WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "xlsx": xlsx_chunks,
+}
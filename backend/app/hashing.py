@@ -0,0 +1,133 @@
+import hashlib
+import hmac
+import os
+import re
+from typing import Dict, Optional, Tuple
+import bcrypt
+
+try:
+    from argon2 import PasswordHasher as Argon2PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi es opcional
+    Argon2PasswordHasher = None
+
+# Esquema con el que se generan los hashes nuevos y costo de bcrypt. El costo se
+# ajusta con scripts/benchmark_password_hashing.py según el presupuesto de latencia del login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+class PasswordHasher:
+    """Esquema de hash de contraseñas: detecta sus hashes, verifica y genera"""
+    scheme = None
+
+    def identify(self, hashed_password: str) -> bool:
+        raise NotImplementedError
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        raise NotImplementedError
+
+    def hash(self, plain_password: str) -> str:
+        raise NotImplementedError
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Indica si el hash fue generado con parámetros distintos a los configurados"""
+        return False
+
+class BcryptHasher(PasswordHasher):
+    scheme = "bcrypt"
+    pattern = re.compile(r"^\$2[aby]\$(\d{2})\$")
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
+    def identify(self, hashed_password: str) -> bool:
+        return bool(self.pattern.match(hashed_password))
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def hash(self, plain_password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(plain_password.encode('utf-8'), salt).decode('utf-8')
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        match = self.pattern.match(hashed_password)
+        return match is None or int(match.group(1)) != self.rounds
+
+class Argon2Hasher(PasswordHasher):
+    scheme = "argon2"
+
+    def __init__(self):
+        self._hasher = Argon2PasswordHasher()
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith("$argon2")
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def hash(self, plain_password: str) -> str:
+        return self._hasher.hash(plain_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed_password)
+
+class LegacySha256Hasher(PasswordHasher):
+    """SHA-256 sin sal usado por scripts/init_parametrizable_system.py; solo se verifica y se migra"""
+    scheme = "sha256"
+    pattern = re.compile(r"^[0-9a-f]{64}$")
+
+    def identify(self, hashed_password: str) -> bool:
+        return bool(self.pattern.match(hashed_password))
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        digest = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(digest, hashed_password)
+
+    def hash(self, plain_password: str) -> str:
+        raise ValueError("sha256 is a legacy scheme and cannot be used for new hashes")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return True
+
+HASHERS: Dict[str, PasswordHasher] = {}
+
+def register_hasher(hasher: PasswordHasher):
+    HASHERS[hasher.scheme] = hasher
+
+register_hasher(BcryptHasher(rounds=BCRYPT_ROUNDS))
+if Argon2PasswordHasher is not None:
+    register_hasher(Argon2Hasher())
+register_hasher(LegacySha256Hasher())
+
+def get_default_hasher() -> PasswordHasher:
+    hasher = HASHERS.get(PASSWORD_HASH_SCHEME)
+    if hasher is None or isinstance(hasher, LegacySha256Hasher):
+        raise ValueError(f"Unsupported PASSWORD_HASH_SCHEME: {PASSWORD_HASH_SCHEME}")
+    return hasher
+
+def identify_hasher(hashed_password: str) -> Optional[PasswordHasher]:
+    """Detecta el esquema de un hash almacenado"""
+    for hasher in HASHERS.values():
+        if hasher.identify(hashed_password):
+            return hasher
+    return None
+
+def hash_password(plain_password: str) -> str:
+    return get_default_hasher().hash(plain_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica la contraseña y, si el hash está desactualizado, retorna uno nuevo con el esquema configurado"""
+    hasher = identify_hasher(hashed_password or "")
+    if hasher is None:
+        return False, None
+    if not hasher.verify(plain_password, hashed_password):
+        return False, None
+
+    default_hasher = get_default_hasher()
+    if hasher is not default_hasher or default_hasher.needs_rehash(hashed_password):
+        return True, default_hasher.hash(plain_password)
+    return True, None
@@ -0,0 +1,357 @@
+import io
+import json
+import os
+from datetime import datetime, timezone
+from enum import Enum
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import Table, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import ARL, Client, User, Task, TaskStatsRollup, TaskStatus, TaskPriority, UserRole
+from app.stats import rebuild_task_stats_rollup
+
+# Carga de los archivos complete_local_data_export_*.json (scripts/export_all_local_data.py)
+# leyendo el JSON de forma incremental e insertando por lotes con punto de control, de modo
+# que una carga interrumpida se puede reanudar desde el último lote confirmado
+
+EXPORT_BATCH_SIZE = 1000
+
+JSON_CHUNK_SIZE = 1 << 16
+
+class JSONStreamReader:
+    """Lee un objeto JSON de nivel superior sin cargar el archivo completo en memoria"""
+
+    def __init__(self, file, chunk_size: int = JSON_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Descartar lo ya consumido para que el buffer no crezca con el archivo
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Fin inesperado del archivo JSON")
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Se esperaba '{char}' en la posición {self.pos} del buffer JSON")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un número al final del buffer puede estar cortado ("1." de "1.5"): leer más antes de aceptarlo
+            if (end == len(self.buffer) or self.buffer[end] in ".eE+-0123456789") and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _items(self) -> Iterator:
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("]")
+            return
+
+    def _skip(self, items: Iterator):
+        for _ in items:
+            pass
+
+    def members(self) -> Iterator[Tuple[str, object]]:
+        """Pares (clave, valor) del objeto; los arreglos se entregan como iteradores de sus elementos"""
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if self._peek() == "[":
+                items = self._items()
+                yield key, items
+                # Consumir lo que el llamador no haya leído antes de continuar
+                self._skip(items)
+            else:
+                yield key, self._value()
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+def _datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def _created_at(value: Optional[str]) -> datetime:
+    return _datetime(value) or datetime.now(timezone.utc)
+
+def _arl_row(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "description": data.get("description"),
+        "is_active": data.get("is_active", True),
+        "created_at": _created_at(data.get("created_at")),
+        "updated_at": _datetime(data.get("updated_at")),
+    }
+
+def _client_row(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "nit": data.get("nit"),
+        "description": data.get("description"),
+        "is_active": data.get("is_active", True),
+        "arl_id": data["arl_id"],
+        "custom_fields_config": data.get("custom_fields_config") or [],
+        "created_at": _created_at(data.get("created_at")),
+        "updated_at": _datetime(data.get("updated_at")),
+    }
+
+def _user_row(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "email": data["email"],
+        "username": data["username"],
+        "full_name": data["full_name"],
+        "hashed_password": data["hashed_password"],
+        "role": UserRole(data["role"]) if data.get("role") else UserRole.USER,
+        "is_active": data.get("is_active", True),
+        "client_id": data["client_id"],
+        # Las exportaciones anteriores no traen token_version
+        "token_version": data.get("token_version", 0),
+        "created_at": _created_at(data.get("created_at")),
+        "updated_at": _datetime(data.get("updated_at")),
+    }
+
+def _task_row(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "title": data["title"],
+        "description": data.get("description"),
+        "status": TaskStatus(data["status"]) if data.get("status") else TaskStatus.PENDIENTE,
+        "priority": TaskPriority(data["priority"]) if data.get("priority") else TaskPriority.MEDIA,
+        "due_date": _datetime(data.get("due_date")),
+        "completed_at": _datetime(data.get("completed_at")),
+        "client_id": data["client_id"],
+        "assigned_to": data.get("assigned_to"),
+        "created_by": data["created_by"],
+        "custom_fields": data.get("custom_fields") or {},
+        "created_at": _created_at(data.get("created_at")),
+        "updated_at": _datetime(data.get("updated_at")),
+    }
+
+# Secciones del archivo en orden de claves foráneas: tabla destino y conversión de cada elemento
+EXPORT_SECTIONS: Dict[str, Tuple[Table, Callable[[dict], dict]]] = {
+    "arls": (ARL.__table__, _arl_row),
+    "clients": (Client.__table__, _client_row),
+    "users": (User.__table__, _user_row),
+    "tasks": (Task.__table__, _task_row),
+}
+
+# Valor NULL en el csv de COPY: sin comillas, para distinguirlo de un texto vacío ("")
+COPY_NULL = r"\N"
+
+COPY_OPTIONS = f"(FORMAT csv, NULL '{COPY_NULL}')"
+
+def _copy_field(value) -> str:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, Enum):
+        # Los enums se guardan en PostgreSQL con el nombre del miembro
+        value = value.name
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, (bool, int, float)):
+        return str(value)
+    # Los textos siempre van entre comillas: un texto "\N" no se lee como NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+def copy_buffer(rows: List[dict], columns: List[str]) -> io.StringIO:
+    """Filas en formato csv para COPY ... FROM STDIN WITH COPY_OPTIONS"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_copy_field(row.get(name)) for name in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+def insert_rows(db: Session, table: Table, rows: List[dict]) -> int:
+    """Inserta las filas conservando sus ids; las que ya existen (mismo id) se omiten. No hace commit"""
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    if db.get_bind().dialect.name != "postgresql":
+        # sqlite (desarrollo y pruebas): INSERT ... ON CONFLICT DO NOTHING con executemany
+        db.execute(sqlite_insert(table).on_conflict_do_nothing(index_elements=["id"]), rows)
+        return len(rows)
+    
+    # COPY a una tabla temporal y de ahí INSERT ... ON CONFLICT, que COPY no soporta
+    staging = f"import_{table.name}"
+    db.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    column_list = ", ".join(columns)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH {COPY_OPTIONS}", copy_buffer(rows, columns))
+    db.execute(text(
+        f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT (id) DO NOTHING"
+    ))
+    return len(rows)
+
+def reset_sequences(db: Session):
+    """Ajusta las secuencias de id al máximo id cargado (solo PostgreSQL); no hace commit"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table, _ in EXPORT_SECTIONS.values():
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table.name}"
+        ))
+
+def clear_tables(db: Session):
+    """Elimina tareas, usuarios, clientes y ARLs (incluido el rollup); no hace commit"""
+    for model in (TaskStatsRollup, Task, User, Client, ARL):
+        db.query(model).delete(synchronize_session=False)
+
+def checkpoint_path(export_file: str) -> str:
+    return f"{export_file}.checkpoint.json"
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # Escritura atómica: un corte a mitad nunca deja un punto de control a medias
+    partial = f"{path}.tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    os.replace(partial, path)
+
+def _admin_credentials(db: Session) -> Optional[dict]:
+    admin = db.query(User).filter(User.username == "admin").first()
+    if admin is None:
+        return None
+    return {
+        "email": admin.email,
+        "full_name": admin.full_name,
+        "hashed_password": admin.hashed_password,
+        "token_version": admin.token_version,
+    }
+
+def _export_has_admin(export_file: str) -> bool:
+    with open(export_file, "r", encoding="utf-8") as f:
+        for key, value in JSONStreamReader(f).members():
+            if key == "users":
+                return any(user.get("username") == "admin" for user in value)
+    return False
+
+def _batches(items: Iterator, size: int) -> Iterator[list]:
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+def load_export(
+    db: Session,
+    export_file: str,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    fresh: bool = False,
+    progress: Callable[[str, int], None] = None,
+) -> dict:
+    """
+    Carga el archivo de exportación conservando los ids. Cada lote se confirma junto con su
+    punto de control; si existe uno del mismo archivo se reanuda desde ahí (salvo fresh=True).
+    Retorna el resumen del archivo y las filas cargadas por sección
+    """
+    path = checkpoint_path(export_file)
+    checkpoint = None if fresh else load_checkpoint(path)
+    loaded = {section: 0 for section in EXPORT_SECTIONS}
+    summary = {}
+    
+    with open(export_file, "r", encoding="utf-8") as f:
+        for key, value in JSONStreamReader(f).members():
+            if key == "export_timestamp":
+                if checkpoint is not None and checkpoint.get("export_timestamp") != value:
+                    raise ValueError(f"El punto de control {path} es de otra exportación; usar fresh=True")
+                if checkpoint is None:
+                    # Las credenciales del admin actual se guardan antes de limpiar las tablas; el admin
+                    # solo se repone desde la exportación, así que sin él no se limpia nada
+                    admin = _admin_credentials(db)
+                    if admin and not _export_has_admin(export_file):
+                        raise ValueError(f"{export_file} no incluye el usuario admin; la carga dejaría el destino sin admin")
+                    checkpoint = {
+                        "export_timestamp": value,
+                        "cleared": False,
+                        "admin": admin,
+                        "sections": {},
+                    }
+                    save_checkpoint(path, checkpoint)
+                if not checkpoint["cleared"]:
+                    clear_tables(db)
+                    db.commit()
+                    checkpoint["cleared"] = True
+                    save_checkpoint(path, checkpoint)
+            elif key in EXPORT_SECTIONS:
+                if checkpoint is None:
+                    raise ValueError("El archivo no empieza con export_timestamp")
+                table, to_row = EXPORT_SECTIONS[key]
+                done = checkpoint["sections"].get(key, 0)
+                loaded[key] = done
+                # Los elementos de lotes ya confirmados se leen pero no se vuelven a insertar
+                for batch in _batches(islice(value, done, None), batch_size):
+                    rows = [to_row(item) for item in batch]
+                    if key == "users" and checkpoint["admin"]:
+                        # El admin del destino conserva su email, nombre y contraseña
+                        for row in rows:
+                            if row["username"] == "admin":
+                                row.update(checkpoint["admin"])
+                    insert_rows(db, table, rows)
+                    db.commit()
+                    loaded[key] += len(rows)
+                    checkpoint["sections"][key] = loaded[key]
+                    save_checkpoint(path, checkpoint)
+                    if progress:
+                        progress(key, loaded[key])
+            elif key == "summary":
+                summary = value
+    
+    reset_sequences(db)
+    rebuild_task_stats_rollup(db)
+    db.commit()
+    os.remove(path)
+    return {"summary": summary, "loaded": loaded}
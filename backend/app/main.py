@@ -1,14 +1,26 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from app.routers import auth, arls, clients, users, tasks, dashboard
+from app.routers import auth, arls, clients, users, tasks, dashboard, metrics
+from app.serialization import JSONResponse
+from app.overdue import start_overdue_scheduler, stop_overdue_scheduler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Job periódico que marca las tareas vencidas (tasks.is_overdue)
+    overdue_task = start_overdue_scheduler()
+    yield
+    await stop_overdue_scheduler(overdue_task)
 
 app = FastAPI(
     title="Task Tracker API",
     description="Sistema de gestión de tareas para múltiples empresas",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=JSONResponse,
+    lifespan=lifespan
 )
 
 # Configurar CORS para Railway
@@ -28,6 +40,7 @@ app.include_router(clients.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(tasks.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 @app.get("/api/v1/health")
 def health_check():
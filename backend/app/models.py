@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, JSON, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -76,6 +77,8 @@ class User(Base):
     role = Column(Enum(UserRole), default=UserRole.USER)
     is_active = Column(Boolean, default=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    # Versión de los tokens del usuario; forma parte de la clave de la caché de autenticación
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -86,6 +89,42 @@ class User(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Filtros más frecuentes de GET /tasks y del dashboard
+        Index("ix_tasks_client_id_status", "client_id", "status"),
+        Index("ix_tasks_assigned_to_status", "assigned_to", "status"),
+        # Tareas abiertas aún no marcadas como vencidas: el job de vencimiento solo recorre
+        # las que vencieron desde su última ejecución. El enum se guarda con el nombre del miembro
+        Index(
+            "ix_tasks_pending_overdue",
+            "due_date",
+            postgresql_where=text("status IN ('PENDIENTE', 'EN_PROGRESO') AND NOT is_overdue")
+        ),
+        # Conteos y listas de tareas vencidas (índice parcial: solo las marcadas)
+        Index(
+            "ix_tasks_overdue",
+            "client_id",
+            "assigned_to",
+            postgresql_where=text("is_overdue")
+        ),
+        # Tareas abiertas de cada asesor por fecha de vencimiento (GET /tasks/due)
+        Index(
+            "ix_tasks_assigned_to_open_due_date",
+            "assigned_to",
+            "due_date",
+            postgresql_where=text("status IN ('PENDIENTE', 'EN_PROGRESO')")
+        ),
+        # Índices para la paginación por cursor (keyset) de GET /tasks/page
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        # Filtros cf.<campo>=valor de GET /tasks (containment @> sobre jsonb)
+        Index(
+            "ix_tasks_custom_fields",
+            "custom_fields",
+            postgresql_using="gin",
+            postgresql_ops={"custom_fields": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -94,14 +133,17 @@ class Task(Base):
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIA)
     due_date = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
+    # Pendiente o en progreso con due_date pasada; lo mantienen las escrituras de tareas y,
+    # para las que vencen con el paso del tiempo, el job periódico de app/overdue.py
+    is_overdue = Column(Boolean, nullable=False, default=False, server_default=text("false"))
     
     # Foreign Keys
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     assigned_to = Column(Integer, ForeignKey("users.id"))
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     
-    # Campos personalizados dinámicos (JSON)
-    custom_fields = Column(JSON, default=dict)
+    # Campos personalizados dinámicos (JSONB en PostgreSQL para poder indexarlos)
+    custom_fields = Column(JSON().with_variant(JSONB(), "postgresql"), default=dict)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -110,4 +152,25 @@ class Task(Base):
     # Relaciones
     client = relationship("Client", back_populates="tasks")
     assigned_user = relationship("User", back_populates="assigned_tasks", foreign_keys=[assigned_to])
-    created_by_user = relationship("User", back_populates="created_tasks", foreign_keys=[created_by])
\ No newline at end of file
+    created_by_user = relationship("User", back_populates="created_tasks", foreign_keys=[created_by])
+
+class TaskStatsRollup(Base):
+    __tablename__ = "task_stats_rollup"
+    __table_args__ = (
+        # NULLS NOT DISTINCT (PostgreSQL 15+): las tareas sin asignar comparten una sola fila
+        # por (cliente, estado) aunque dos transacciones la creen a la vez
+        UniqueConstraint(
+            "client_id", "assigned_to", "status",
+            name="uq_task_stats_rollup_key",
+            postgresql_nulls_not_distinct=True
+        ),
+    )
+    
+    # Contadores de tareas por (cliente, usuario asignado, estado), mantenidos
+    # incrementalmente al crear/actualizar/eliminar tareas. Es una tabla derivada
+    # de tasks (se puede reconstruir), por eso no tiene claves foráneas
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, nullable=False, index=True)
+    assigned_to = Column(Integer, index=True)
+    status = Column(Enum(TaskStatus))
+    task_count = Column(Integer, nullable=False, default=0)
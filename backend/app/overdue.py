@@ -0,0 +1,132 @@
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.stats import mark_overdue_statement, clear_overdue_statement
+
+logger = logging.getLogger(__name__)
+
+# Job periódico en el proceso de la API que mantiene tasks.is_overdue para las tareas que
+# vencen con el paso del tiempo (las escrituras de tareas ya actualizan la marca). Con varios
+# workers cada uno ejecuta el job: los UPDATE son idempotentes y cada transición la reporta
+# solo el worker que cambió la fila
+OVERDUE_SCHEDULER_ENABLED = os.getenv("OVERDUE_SCHEDULER_ENABLED", "true").lower() == "true"
+OVERDUE_CHECK_INTERVAL = float(os.getenv("OVERDUE_CHECK_INTERVAL", "60"))
+
+# Cambio de la marca de una tarea: is_overdue=True si venció, False si dejó de estar vencida
+OverdueTransition = namedtuple("OverdueTransition", ["task_id", "client_id", "assigned_to", "is_overdue"])
+
+# Funciones (normales o async) que reciben la lista de transiciones de cada ejecución
+overdue_listeners: List[Callable[[List[OverdueTransition]], object]] = []
+
+def on_overdue_transition(listener: Callable[[List[OverdueTransition]], object]):
+    """Registra un listener de transiciones; se puede usar como decorador"""
+    overdue_listeners.append(listener)
+    return listener
+
+class OverdueJobMetrics:
+    """Contadores de las ejecuciones del job de tareas vencidas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.marked = 0
+        self.cleared = 0
+        self.last_run_at = None
+        self.last_duration_ms = None
+
+    def record(self, duration_seconds: float, transitions: List[OverdueTransition] = None):
+        with self._lock:
+            if transitions is None:
+                self.failures += 1
+            else:
+                self.runs += 1
+                self.marked += sum(1 for transition in transitions if transition.is_overdue)
+                self.cleared += sum(1 for transition in transitions if not transition.is_overdue)
+            self.last_run_at = datetime.now(timezone.utc).isoformat()
+            self.last_duration_ms = duration_seconds * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": OVERDUE_SCHEDULER_ENABLED,
+                "interval_seconds": OVERDUE_CHECK_INTERVAL,
+                "runs": self.runs,
+                "failures": self.failures,
+                "marked": self.marked,
+                "cleared": self.cleared,
+                "last_run_at": self.last_run_at,
+                "last_duration_ms": self.last_duration_ms,
+            }
+
+overdue_job_metrics = OverdueJobMetrics()
+
+async def refresh_overdue_tasks(db: AsyncSession, now: datetime = None) -> List[OverdueTransition]:
+    """Marca las tareas que vencieron y desmarca las que ya no lo están; hace commit"""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    marked = (await db.execute(mark_overdue_statement(now))).all()
+    cleared = (await db.execute(clear_overdue_statement(now))).all()
+    await db.commit()
+    return (
+        [OverdueTransition(row.id, row.client_id, row.assigned_to, True) for row in marked]
+        + [OverdueTransition(row.id, row.client_id, row.assigned_to, False) for row in cleared]
+    )
+
+async def run_overdue_check() -> List[OverdueTransition]:
+    """Una ejecución del job: actualiza las marcas y notifica las transiciones"""
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            transitions = await refresh_overdue_tasks(db)
+    except Exception:
+        overdue_job_metrics.record(time.perf_counter() - start)
+        raise
+    overdue_job_metrics.record(time.perf_counter() - start, transitions)
+    
+    if transitions:
+        marked = sum(1 for transition in transitions if transition.is_overdue)
+        logger.info("Tareas vencidas: %d marcadas, %d desmarcadas", marked, len(transitions) - marked)
+        for listener in overdue_listeners:
+            try:
+                result = listener(transitions)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                # Un listener con errores no detiene el job ni a los demás listeners
+                logger.exception("Error en listener de tareas vencidas")
+    return transitions
+
+async def overdue_scheduler(interval: float = OVERDUE_CHECK_INTERVAL):
+    """Ejecuta el job cada interval segundos hasta que se cancela"""
+    while True:
+        try:
+            await run_overdue_check()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error revisando tareas vencidas")
+        await asyncio.sleep(interval)
+
+def start_overdue_scheduler() -> Optional[asyncio.Task]:
+    """Inicia el job en el event loop actual (None si está deshabilitado)"""
+    if not OVERDUE_SCHEDULER_ENABLED:
+        return None
+    return asyncio.create_task(overdue_scheduler())
+
+async def stop_overdue_scheduler(task: Optional[asyncio.Task]):
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from app.models import User
+from app.auth import require_admin, user_cache, password_verify_metrics
+from app.overdue import overdue_job_metrics
+from app.database import (
+    engine, async_engine, pool_stats,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/")
+def read_metrics(current_user: User = Depends(require_admin)):
+    """Métricas internas del proceso (caché de autenticación, verificación de contraseñas, pools de conexiones y job de vencidas)"""
+    return {
+        "user_cache": user_cache.stats(),
+        "password_verify": password_verify_metrics.stats(),
+        "database_pool": {
+            "config": {
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout": DB_POOL_TIMEOUT,
+                "pool_recycle": DB_POOL_RECYCLE,
+                "pool_pre_ping": DB_POOL_PRE_PING,
+            },
+            "sync": pool_stats(engine.pool),
+            "async": pool_stats(async_engine.sync_engine.pool),
+        },
+        "overdue_job": overdue_job_metrics.stats(),
+    }
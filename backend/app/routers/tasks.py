@@ -1,60 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from datetime import datetime
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, case, func, select, insert, update, delete, literal, union_all, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import List, Optional, Union
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from collections import Counter
+import base64
+import json
+import re
+from app.database import get_async_db, async_engine
 from app.models import Task, User, Client
-from app.schemas import Task as TaskSchema, TaskCreate, TaskUpdate
+from app.schemas import (
+    Task as TaskSchema, TaskCreate, TaskUpdate, TaskPage,
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkDelete, TaskBulkResult,
+    TaskSummary, ClientSummary, UserSummary, TaskSummaryList, DueTaskList
+)
 from app.auth import get_current_active_user
+from app.serialization import JSONResponse, tasks_to_list, TASK_OPTIONAL_COLUMNS
+from app.stats import (
+    task_rollup_key, record_task_rollup_change, apply_rollup_deltas, rollup_key, task_is_overdue, OPEN_STATUSES
+)
+from app.search import task_search_condition, task_search_rank
+from app.export import task_export_query, EXPORT_WRITERS, EXPORT_MEDIA_TYPES
 
 router = APIRouter(prefix="", tags=["tasks"])
 
+# Columnas de User que se serializan en las respuestas (nunca hashed_password)
+USER_RESPONSE_COLUMNS = (
+    User.id, User.email, User.username, User.full_name, User.role,
+    User.is_active, User.client_id, User.created_at, User.updated_at,
+)
+
+def task_relationship_options(loader=joinedload):
+    """Carga de cliente y usuarios de la tarea; en modo async no hay lazy loading"""
+    return (
+        loader(Task.client).joinedload(Client.arl),
+        loader(Task.assigned_user).load_only(*USER_RESPONSE_COLUMNS)
+        .joinedload(User.client).joinedload(Client.arl),
+        loader(Task.created_by_user).load_only(*USER_RESPONSE_COLUMNS)
+        .joinedload(User.client).joinedload(Client.arl),
+    )
+
+# Relaciones que necesita el esquema Task para serializar la respuesta de una tarea
+TASK_RESPONSE_OPTIONS = task_relationship_options()
+
+def parse_task_include(include: Optional[str]) -> tuple:
+    """Valida el parámetro include= (columnas opcionales separadas por coma)"""
+    if not include or not include.strip():
+        return ()
+    fields = tuple(field.strip() for field in include.split(",") if field.strip())
+    invalid = [field for field in fields if field not in TASK_OPTIONAL_COLUMNS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"include accepts only: {', '.join(TASK_OPTIONAL_COLUMNS)}"
+        )
+    return fields
+
+def task_list_options(include: tuple, loader=joinedload):
+    """Proyección para listas: difiere las columnas opcionales no pedidas en include"""
+    task_columns = [
+        column for column in Task.__table__.columns
+        if column.key not in TASK_OPTIONAL_COLUMNS or column.key in include
+    ]
+    return (
+        load_only(*[getattr(Task, column.key) for column in task_columns]),
+        *task_relationship_options(loader),
+    )
+
+async def get_task_for_response(db: AsyncSession, task_id: int) -> Optional[Task]:
+    """Carga la tarea con todas las relaciones que serializa la respuesta"""
+    result = await db.scalars(
+        select(Task)
+        .options(*TASK_RESPONSE_OPTIONS)
+        .where(Task.id == task_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.first()
+
+async def get_task_for_update(db: AsyncSession, task_id: int) -> Optional[Task]:
+    """Tarea bloqueada (FOR UPDATE) hasta el commit: su clave de rollup no cambia mientras se edita"""
+    return await db.scalar(select(Task).where(Task.id == task_id).with_for_update())
+
+async def load_task_create_references(db: AsyncSession, client_id: int, user_ids: set):
+    """Carga en una sola consulta el cliente y los usuarios de una tarea nueva, con lo que serializa la respuesta"""
+    rows = (await db.execute(
+        select(Client, User)
+        .outerjoin(User, User.id.in_(user_ids))
+        .where(Client.id == client_id)
+        .options(
+            joinedload(Client.arl),
+            load_only(*USER_RESPONSE_COLUMNS),
+            joinedload(User.client).joinedload(Client.arl),
+        )
+    )).all()
+    if not rows:
+        return None, {}
+    return rows[0].Client, {row.User.id: row.User for row in rows if row.User is not None}
+
 @router.post("/tasks", response_model=TaskSchema)
-def create_task(
+async def create_task(
     task: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
+    # Cliente, usuario asignado y creador en una sola consulta
+    user_ids = {current_user.id}
+    if task.assigned_to:
+        user_ids.add(task.assigned_to)
+    client, users = await load_task_create_references(db, task.client_id, user_ids)
+    
     # Verificar que el cliente existe
-    client = db.query(Client).filter(Client.id == task.client_id).first()
-    if not client:
+    if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
     
     # Verificar que el usuario asignado existe y pertenece al cliente
+    assigned_user = None
     if task.assigned_to:
-        assigned_user = db.query(User).filter(User.id == task.assigned_to).first()
+        assigned_user = users.get(task.assigned_to)
         if not assigned_user:
             raise HTTPException(status_code=404, detail="Assigned user not found")
         if assigned_user.client_id != task.client_id:
             raise HTTPException(status_code=400, detail="Assigned user must belong to the same client")
     
-    db_task = Task(
-        title=task.title,
-        description=task.description,
-        status=task.status,
-        priority=task.priority,
-        due_date=task.due_date,
-        client_id=task.client_id,
-        assigned_to=task.assigned_to,
-        created_by=current_user.id
+    # INSERT ... RETURNING trae la fila completa (incluidos los valores por defecto del servidor)
+    db_task = await db.scalar(
+        insert(Task).values(
+            title=task.title,
+            description=task.description,
+            status=task.status,
+            priority=task.priority,
+            due_date=task.due_date,
+            is_overdue=task_is_overdue(task.status, task.due_date),
+            custom_fields=task.custom_fields,
+            client_id=task.client_id,
+            assigned_to=task.assigned_to,
+            created_by=current_user.id
+        ).returning(Task)
     )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    # Las relaciones de la respuesta ya están cargadas: se asignan sin consultar de nuevo
+    set_committed_value(db_task, "client", client)
+    set_committed_value(db_task, "assigned_user", assigned_user)
+    set_committed_value(db_task, "created_by_user", users[current_user.id])
+    
+    # El rollup se actualiza en la misma transacción que la tarea
+    await record_task_rollup_change(db, new_key=task_rollup_key(db_task))
+    await db.commit()
     return db_task
 
-@router.get("/tasks", response_model=List[TaskSchema])
-def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    client_id: Optional[str] = Query(None),
-    assigned_to: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+# Prefijo de los parámetros que filtran por campos personalizados: ?cf.programa=...
+CUSTOM_FIELD_FILTER_PREFIX = "cf."
+
+def parse_custom_field_filters(request: Request) -> dict:
+    """Extrae los filtros cf.<campo>=valor de la query string"""
+    custom_fields = {}
+    for key, value in request.query_params.items():
+        if not key.startswith(CUSTOM_FIELD_FILTER_PREFIX):
+            continue
+        name = key[len(CUSTOM_FIELD_FILTER_PREFIX):].strip()
+        if not name:
+            raise HTTPException(status_code=400, detail="Custom field filter must be cf.<name>=value")
+        custom_fields[name] = value
+    return custom_fields
+
+def custom_fields_condition(custom_fields: dict):
+    """Predicado sobre custom_fields; en PostgreSQL es un @> que usa el índice GIN"""
+    if async_engine.dialect.name == "postgresql":
+        # El tipo declarado es JSON con variante JSONB: se fuerza el comparador de JSONB
+        return type_coerce(Task.custom_fields, JSONB).contains(custom_fields)
+    return and_(*[
+        Task.custom_fields[name].as_string() == value
+        for name, value in custom_fields.items()
+    ])
+
+def apply_task_filters(
+    query,
+    current_user: User,
+    client_id: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    status: Optional[str] = None,
+    custom_fields: Optional[dict] = None,
+    overdue: Optional[bool] = None
 ):
-    query = db.query(Task)
-    
+    """Aplica las reglas de acceso por cliente y los filtros comunes de tareas"""
     # Los usuarios solo pueden ver tareas de su cliente, excepto los admins
     if current_user.role != "admin":
         query = query.filter(Task.client_id == current_user.client_id)
@@ -76,24 +208,507 @@ def read_tasks(
     if status and status.strip():
         query = query.filter(Task.status == status)
     
-    tasks = query.options(
-        joinedload(Task.assigned_user),
-        joinedload(Task.client),
-        joinedload(Task.created_by_user)
-    ).offset(skip).limit(limit).all()
-    return tasks
+    # Los valores importados desde Excel se guardan como texto
+    if custom_fields:
+        query = query.filter(custom_fields_condition(custom_fields))
+    
+    # Marca precalculada (índice parcial ix_tasks_overdue), no una comparación con la hora actual
+    if overdue is not None:
+        query = query.filter(Task.is_overdue == overdue)
+    
+    return query
+
+# Vistas de GET /tasks: "full" anida cliente y usuarios en cada tarea (comportamiento
+# original); "summary" retorna ids planos y los clientes/usuarios una sola vez
+TASK_VIEWS = ("full", "summary")
+
+async def read_task_summaries(db: AsyncSession, query) -> dict:
+    """Ejecuta la consulta de la vista resumida y carga los clientes/usuarios referenciados sin repetir"""
+    # Las filas ya tienen la forma de TaskSummary: se serializan sin revalidar
+    tasks = [dict(row._mapping) for row in (await db.execute(query)).all()]
+    return {"tasks": tasks, **(await load_summary_references(db, tasks))}
+
+async def load_summary_references(db: AsyncSession, tasks: List[dict]) -> dict:
+    """Clientes y usuarios (por id) referenciados por las tareas de la vista resumida"""
+    client_ids = {task["client_id"] for task in tasks}
+    user_ids = {task["assigned_to"] for task in tasks if task["assigned_to"]} | {task["created_by"] for task in tasks}
+    
+    clients = {}
+    if client_ids:
+        client_columns = [getattr(Client, field) for field in ClientSummary.model_fields]
+        client_rows = (await db.execute(select(*client_columns).where(Client.id.in_(client_ids)))).all()
+        clients = {row.id: dict(row._mapping) for row in client_rows}
+    
+    users = {}
+    if user_ids:
+        user_columns = [getattr(User, field) for field in UserSummary.model_fields]
+        user_rows = (await db.execute(select(*user_columns).where(User.id.in_(user_ids)))).all()
+        users = {row.id: dict(row._mapping) for row in user_rows}
+    
+    return {"clients": clients, "users": users}
+
+@router.get("/tasks", response_model=Union[List[TaskSchema], TaskSummaryList])
+async def read_tasks(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    client_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    overdue: Optional[bool] = Query(None),
+    view: str = Query("full"),
+    include: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if view not in TASK_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of {', '.join(TASK_VIEWS)}")
+    
+    custom_fields = parse_custom_field_filters(request)
+    
+    if view == "summary":
+        summary_columns = [getattr(Task, field) for field in TaskSummary.model_fields]
+        query = apply_task_filters(
+            select(*summary_columns), current_user, client_id, assigned_to, status, custom_fields, overdue
+        )
+        return JSONResponse(await read_task_summaries(db, query.offset(skip).limit(limit)))
+    
+    include_fields = parse_task_include(include)
+    query = apply_task_filters(select(Task), current_user, client_id, assigned_to, status, custom_fields, overdue)
+    
+    tasks = (await db.scalars(
+        query.options(*task_list_options(include_fields)).offset(skip).limit(limit)
+    )).all()
+    # Datos de la base de datos: se construye el JSON directamente sin revalidar con pydantic
+    return JSONResponse(tasks_to_list(tasks, include_fields))
+
+# Orden soportado por la paginación por cursor: created_at descendente o due_date ascendente
+CURSOR_ORDERS = ("created_at", "due_date")
+
+def encode_cursor(order_by: str, task: Task) -> str:
+    """Genera el cursor opaco que apunta justo después de la tarea dada"""
+    value = getattr(task, order_by)
+    payload = {
+        "o": order_by,
+        "v": value.isoformat() if value is not None else None,
+        "id": task.id
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, order_by: str):
+    """Decodifica un cursor; retorna (valor, id) o lanza 400 si no es válido"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if payload["o"] != order_by:
+            raise ValueError("cursor order mismatch")
+        value = datetime.fromisoformat(payload["v"]) if payload["v"] is not None else None
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_phases(query, order_by: str, cursor: Optional[str]) -> list:
+    """Consultas (en orden de lectura) con las filas posteriores al cursor (paginación keyset)"""
+    if order_by == "created_at":
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        if cursor:
+            value, last_id = decode_cursor(cursor, order_by)
+            query = query.filter(tuple_(Task.created_at, Task.id) < tuple_(value, last_id))
+        return [query]
+    
+    # due_date puede ser nulo: las tareas sin fecha van al final, en una segunda fase ordenada por id.
+    # Cada fase es un rango simple de ix_tasks_due_date_id; un OR con "due_date IS NULL" no puede usarlo.
+    # La segunda fase también ordena por (due_date, id): PostgreSQL no deduce que due_date es constante
+    # y con solo "ORDER BY id" recorrería la llave primaria filtrando las tareas con fecha
+    value, last_id = decode_cursor(cursor, order_by) if cursor else (None, None)
+    undated = query.filter(Task.due_date.is_(None)).order_by(Task.due_date.asc(), Task.id.asc())
+    if cursor and value is None:
+        return [undated.filter(Task.id > last_id)]
+    dated = query.filter(Task.due_date.isnot(None)).order_by(Task.due_date.asc(), Task.id.asc())
+    if cursor:
+        dated = dated.filter(tuple_(Task.due_date, Task.id) > tuple_(value, last_id))
+    return [dated, undated]
+
+@router.get("/tasks/page", response_model=TaskPage)
+async def read_tasks_page(
+    request: Request,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    order_by: str = Query("created_at"),
+    client_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    overdue: Optional[bool] = Query(None),
+    include: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Lista tareas con paginación por cursor; el costo por página no depende de la profundidad"""
+    if order_by not in CURSOR_ORDERS:
+        raise HTTPException(status_code=400, detail=f"order_by must be one of {', '.join(CURSOR_ORDERS)}")
+    
+    include_fields = parse_task_include(include)
+    custom_fields = parse_custom_field_filters(request)
+    query = apply_task_filters(select(Task), current_user, client_id, assigned_to, status, custom_fields, overdue)
+    
+    # selectinload carga cada cliente/usuario una sola vez en lugar de repetirlo por fila;
+    # la fase siguiente solo se consulta si la anterior no llenó la página
+    tasks = []
+    for phase in keyset_phases(query, order_by, cursor):
+        tasks += (await db.scalars(
+            phase.options(*task_list_options(include_fields, loader=selectinload)).limit(limit + 1 - len(tasks))
+        )).all()
+        if len(tasks) > limit:
+            break
+    
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(order_by, tasks[-1])
+    
+    return JSONResponse({"items": tasks_to_list(tasks, include_fields), "next_cursor": next_cursor})
+
+@router.get("/tasks/search", response_model=List[TaskSchema])
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    client_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    overdue: Optional[bool] = Query(None),
+    include: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Busca tareas por título, descripción y campos personalizados, ordenadas por relevancia"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    
+    include_fields = parse_task_include(include)
+    custom_fields = parse_custom_field_filters(request)
+    query = apply_task_filters(select(Task), current_user, client_id, assigned_to, status, custom_fields, overdue)
+    query = query.where(task_search_condition(q)).order_by(task_search_rank(q).desc(), Task.id.desc())
+    
+    tasks = (await db.scalars(
+        query.options(*task_list_options(include_fields)).offset(skip).limit(limit)
+    )).all()
+    return JSONResponse(tasks_to_list(tasks, include_fields))
+
+@router.get("/tasks/export")
+async def export_tasks(
+    request: Request,
+    export_format: str = Query("csv", alias="format"),
+    client_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    overdue: Optional[bool] = Query(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Exporta las tareas filtradas como csv, xlsx o ndjson sin cargarlas todas en memoria"""
+    if export_format not in EXPORT_WRITERS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_WRITERS)}")
+    
+    custom_fields = parse_custom_field_filters(request)
+    query = apply_task_filters(
+        task_export_query(), current_user, client_id, assigned_to, status, custom_fields, overdue
+    )
+    return StreamingResponse(
+        EXPORT_WRITERS[export_format](query),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'}
+    )
+
+# Agrupación soportada por GET /tasks/due y ventana máxima hacia adelante
+DUE_GROUPS = ("assigned_to", "client_id")
+DUE_BUCKETS = ("overdue", "today", "upcoming")
+DUE_MAX_WINDOW = timedelta(days=90)
+DUE_WINDOW_PATTERN = re.compile(r"^(\d+)([hd])$")
+
+def parse_due_window(window: str) -> timedelta:
+    """Ventana como '<n>d' (días) o '<n>h' (horas); lanza 400 si no es válida"""
+    match = DUE_WINDOW_PATTERN.match(window.strip())
+    if not match:
+        raise HTTPException(status_code=400, detail="window must look like 7d or 24h")
+    amount, unit = int(match.group(1)), match.group(2)
+    value = timedelta(days=amount) if unit == "d" else timedelta(hours=amount)
+    if value > DUE_MAX_WINDOW:
+        raise HTTPException(status_code=400, detail=f"window must be at most {DUE_MAX_WINDOW.days}d")
+    return value
+
+def parse_due_timezone(tz: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+@router.get("/tasks/due", response_model=DueTaskList)
+async def read_due_tasks(
+    request: Request,
+    window: str = Query("7d"),
+    group_by: str = Query("assigned_to"),
+    limit: int = Query(5, ge=1, le=50),
+    tz: str = Query("UTC"),
+    client_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Tareas abiertas vencidas, que vencen hoy (en la zona horaria tz) o dentro de la ventana,
+    agrupadas por asesor o cliente: cantidad y las limit más próximas de cada bucket
+    """
+    if group_by not in DUE_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(DUE_GROUPS)}")
+    
+    # Los límites se comparan en UTC (sqlite guarda las fechas sin zona horaria)
+    local_now = datetime.now(parse_due_timezone(tz))
+    now = local_now.astimezone(timezone.utc)
+    tomorrow = datetime.combine(local_now.date() + timedelta(days=1), time(), local_now.tzinfo)
+    end_of_today = tomorrow.astimezone(timezone.utc)
+    window_end = now + parse_due_window(window)
+    
+    group_column = getattr(Task, group_by)
+    bucket = case((Task.due_date < now, "overdue"), (Task.due_date < end_of_today, "today"), else_="upcoming")
+    # El bucket crece con due_date: la partición sigue el orden de ix_tasks_assigned_to_open_due_date
+    partition = (group_column, bucket)
+    summary_columns = [getattr(Task, field) for field in TaskSummary.model_fields]
+    ranked = apply_task_filters(
+        select(
+            *summary_columns,
+            bucket.label("bucket"),
+            func.count().over(partition_by=partition).label("bucket_count"),
+            func.row_number().over(partition_by=partition, order_by=(Task.due_date, Task.id)).label("bucket_rank"),
+        ),
+        current_user, client_id, assigned_to, custom_fields=parse_custom_field_filters(request)
+    ).where(Task.status.in_(OPEN_STATUSES), Task.due_date < window_end).subquery()
+    
+    # Conteos y primeras tareas de cada bucket en una sola consulta
+    rows = (await db.execute(
+        select(ranked)
+        .where(ranked.c.bucket_rank <= limit)
+        .order_by(ranked.c[group_by].is_(None), ranked.c[group_by], ranked.c.bucket_rank)
+    )).all()
+    
+    groups = {}
+    tasks = []
+    for row in rows:
+        task = dict(row._mapping)
+        name = task.pop("bucket")
+        count = task.pop("bucket_count")
+        del task["bucket_rank"]
+        group_id = task[group_by]
+        if group_id not in groups:
+            groups[group_id] = {"group_id": group_id, **{key: {"count": 0, "tasks": []} for key in DUE_BUCKETS}}
+        groups[group_id][name]["count"] = count
+        groups[group_id][name]["tasks"].append(task)
+        tasks.append(task)
+    
+    return JSONResponse({
+        "group_by": group_by,
+        "now": now,
+        "window_end": window_end,
+        "groups": list(groups.values()),
+        **(await load_summary_references(db, tasks)),
+    })
+
+# Máximo de elementos por petición masiva
+TASK_BULK_MAX_ITEMS = 5000
+
+def check_bulk_size(count: int):
+    if count > TASK_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Bulk requests accept at most {TASK_BULK_MAX_ITEMS} items")
+
+async def load_task_references(db: AsyncSession, client_ids: set, user_ids: set):
+    """Valida en una sola consulta los clientes y usuarios referenciados.
+    Retorna los ids de clientes existentes y el cliente de cada usuario existente"""
+    rows = (await db.execute(union_all(
+        select(literal("client").label("kind"), Client.id.label("id"), Client.id.label("client_id"))
+        .where(Client.id.in_(client_ids)),
+        select(literal("user"), User.id, User.client_id).where(User.id.in_(user_ids)),
+    ))).all()
+    clients = {row.id for row in rows if row.kind == "client"}
+    users = {row.id: row.client_id for row in rows if row.kind == "user"}
+    return clients, users
+
+def assignee_error(assigned_to: Optional[int], client_id: int, users: dict) -> Optional[str]:
+    """Mensaje de error si el usuario asignado no existe o no pertenece al cliente"""
+    if not assigned_to:
+        return None
+    if assigned_to not in users:
+        return "Assigned user not found"
+    if users[assigned_to] != client_id:
+        return "Assigned user must belong to the same client"
+    return None
+
+async def load_tasks_for_bulk(db: AsyncSession, task_ids: list) -> dict:
+    """Columnas de las tareas que necesitan las operaciones masivas (permisos, rollup y vencimiento)"""
+    # FOR UPDATE (en orden de id para no bloquearse con otra operación masiva): la clave de rollup
+    # leída no puede cambiar antes del commit, o dos peticiones descontarían la misma tarea
+    rows = (await db.execute(
+        select(Task.id, Task.client_id, Task.assigned_to, Task.status, Task.due_date)
+        .where(Task.id.in_(set(task_ids)))
+        .order_by(Task.id)
+        .with_for_update()
+    )).all()
+    return {row.id: row for row in rows}
+
+def bulk_task_error(current_user: User, task_id: int, task, seen: set) -> Optional[str]:
+    """Validaciones comunes de actualización y eliminación masiva de una tarea"""
+    if task_id in seen:
+        return "Duplicate task id"
+    seen.add(task_id)
+    if task is None:
+        return "Task not found"
+    if current_user.role != "admin" and task.client_id != current_user.client_id:
+        return "Not enough permissions"
+    return None
+
+@router.post("/tasks/bulk", response_model=TaskBulkResult)
+async def create_tasks_bulk(
+    bulk: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Crea varias tareas en una sola transacción; los elementos inválidos se reportan sin abortar el resto"""
+    check_bulk_size(len(bulk.items))
+    clients, users = await load_task_references(
+        db,
+        {item.client_id for item in bulk.items},
+        {item.assigned_to for item in bulk.items if item.assigned_to}
+    )
+    
+    errors = []
+    rows = []
+    for index, item in enumerate(bulk.items):
+        error = "Client not found" if item.client_id not in clients else assignee_error(
+            item.assigned_to, item.client_id, users
+        )
+        if error:
+            errors.append({"index": index, "id": None, "detail": error})
+            continue
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "status": item.status,
+            "priority": item.priority,
+            "due_date": item.due_date,
+            "is_overdue": task_is_overdue(item.status, item.due_date),
+            "custom_fields": item.custom_fields,
+            "client_id": item.client_id,
+            "assigned_to": item.assigned_to,
+            "created_by": current_user.id,
+        })
+    
+    created = []
+    if rows:
+        # INSERT ... RETURNING por lotes (insertmanyvalues) en el orden de los elementos
+        created = (await db.execute(
+            insert(Task).returning(
+                Task.id, Task.client_id, Task.assigned_to, Task.status, sort_by_parameter_order=True
+            ),
+            rows
+        )).all()
+        deltas = Counter(task_rollup_key(row) for row in created)
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+    
+    return JSONResponse({"succeeded": [row.id for row in created], "errors": errors})
+
+@router.patch("/tasks/bulk", response_model=TaskBulkResult)
+async def update_tasks_bulk(
+    bulk: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Actualiza varias tareas (p. ej. reasignar un programa completo) en una sola transacción"""
+    check_bulk_size(len(bulk.items))
+    tasks = await load_tasks_for_bulk(db, [item.id for item in bulk.items])
+    _, users = await load_task_references(
+        db, set(), {item.assigned_to for item in bulk.items if item.assigned_to}
+    )
+    
+    errors = []
+    rows = []
+    deltas = Counter()
+    seen = set()
+    for index, item in enumerate(bulk.items):
+        task = tasks.get(item.id)
+        error = bulk_task_error(current_user, item.id, task, seen)
+        update_data = item.dict(exclude_unset=True)
+        if error is None and "assigned_to" in update_data:
+            error = assignee_error(update_data["assigned_to"], task.client_id, users)
+        if error:
+            errors.append({"index": index, "id": item.id, "detail": error})
+            continue
+        
+        # Si se cambia el estado a completada, establecer completed_at
+        if "status" in update_data and update_data["status"] == "completada":
+            update_data["completed_at"] = datetime.utcnow()
+        if "status" in update_data or "due_date" in update_data:
+            update_data["is_overdue"] = task_is_overdue(
+                update_data.get("status", task.status),
+                update_data.get("due_date", task.due_date)
+            )
+        rows.append(update_data)
+        
+        old_key = task_rollup_key(task)
+        new_key = rollup_key(
+            task.client_id,
+            update_data.get("assigned_to", task.assigned_to),
+            update_data.get("status", task.status)
+        )
+        if old_key != new_key:
+            deltas[old_key] -= 1
+            deltas[new_key] += 1
+    
+    if rows:
+        # UPDATE por clave primaria con executemany, agrupado por columnas modificadas
+        await db.execute(update(Task), rows)
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+    
+    return JSONResponse({"succeeded": [row["id"] for row in rows], "errors": errors})
+
+@router.delete("/tasks/bulk", response_model=TaskBulkResult)
+async def delete_tasks_bulk(
+    bulk: TaskBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Elimina varias tareas en una sola transacción"""
+    check_bulk_size(len(bulk.ids))
+    tasks = await load_tasks_for_bulk(db, bulk.ids)
+    
+    errors = []
+    deleted_ids = []
+    deltas = Counter()
+    seen = set()
+    for index, task_id in enumerate(bulk.ids):
+        task = tasks.get(task_id)
+        error = bulk_task_error(current_user, task_id, task, seen)
+        if error:
+            errors.append({"index": index, "id": task_id, "detail": error})
+            continue
+        deleted_ids.append(task_id)
+        deltas[task_rollup_key(task)] -= 1
+    
+    if deleted_ids:
+        await db.execute(
+            delete(Task).where(Task.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+        )
+        await apply_rollup_deltas(db, deltas)
+        await db.commit()
+    
+    return JSONResponse({"succeeded": deleted_ids, "errors": errors})
 
 @router.get("/tasks/{task_id}", response_model=TaskSchema)
-def read_task(
+async def read_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    task = db.query(Task).options(
-        joinedload(Task.assigned_user),
-        joinedload(Task.client),
-        joinedload(Task.created_by_user)
-    ).filter(Task.id == task_id).first()
+    task = await get_task_for_response(db, task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -104,13 +719,13 @@ def read_task(
     return task
 
 @router.put("/tasks/{task_id}", response_model=TaskSchema)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await get_task_for_update(db, task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -124,20 +739,23 @@ def update_task(
     if "status" in update_data and update_data["status"] == "completada":
         update_data["completed_at"] = datetime.utcnow()
     
+    old_rollup_key = task_rollup_key(task)
     for field, value in update_data.items():
         setattr(task, field, value)
+    if "status" in update_data or "due_date" in update_data:
+        task.is_overdue = task_is_overdue(task.status, task.due_date)
+    await record_task_rollup_change(db, old_key=old_rollup_key, new_key=task_rollup_key(task))
     
-    db.commit()
-    db.refresh(task)
-    return task
+    await db.commit()
+    return await get_task_for_response(db, task_id)
 
 @router.delete("/tasks/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await get_task_for_update(db, task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -145,6 +763,7 @@ def delete_task(
     if current_user.role != "admin" and task.client_id != current_user.client_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db.delete(task)
-    db.commit()
+    await record_task_rollup_change(db, old_key=task_rollup_key(task))
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
@@ -4,10 +4,13 @@ from typing import List
 from app.database import get_db
 from app.models import User, Client
 from app.schemas import User as UserSchema, UserCreate, UserUpdate
-from app.auth import get_current_active_user, require_admin, get_password_hash
+from app.auth import get_current_active_user, require_admin, get_password_hash, invalidate_cached_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Campos incluidos en los claims del token o que determinan si es válido
+TOKEN_REVOKING_FIELDS = ("username", "role", "is_active")
+
 @router.post("/", response_model=UserSchema)
 def create_user(
     user: UserCreate,
@@ -84,11 +87,22 @@ def update_user(
     if current_user.role != "admin" and user.client_id != current_user.client_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    old_username = user.username
     update_data = user_update.dict(exclude_unset=True)
+    
+    # Los cambios que afectan la autorización revocan los tokens emitidos
+    revoke_tokens = any(
+        field in update_data and update_data[field] != getattr(user, field)
+        for field in TOKEN_REVOKING_FIELDS
+    )
+    
     for field, value in update_data.items():
         setattr(user, field, value)
+    if revoke_tokens:
+        user.token_version = (user.token_version or 0) + 1
     
     db.commit()
+    invalidate_cached_user(old_username, user_id)
     db.refresh(user)
     return user
 
@@ -102,6 +116,8 @@ def delete_user(
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
+    username = user.username
     db.delete(user)
     db.commit()
+    invalidate_cached_user(username, user_id)
     return {"message": "User deleted successfully"}
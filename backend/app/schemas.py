@@ -110,6 +110,7 @@ class Task(TaskBase):
     assigned_to: Optional[int] = None
     created_by: int
     completed_at: Optional[datetime] = None
+    is_overdue: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     client: Client
@@ -119,6 +120,93 @@ class Task(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskPage(BaseModel):
+    items: List[Task]
+    next_cursor: Optional[str] = None
+
+# Operaciones masivas sobre tareas: los errores se reportan por elemento
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate]
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem]
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int]
+
+class TaskBulkError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    detail: str
+
+class TaskBulkResult(BaseModel):
+    succeeded: List[int]
+    errors: List[TaskBulkError]
+
+# Vista resumida de tareas: ids planos y clientes/usuarios sin repetir
+class TaskSummary(BaseModel):
+    id: int
+    title: str
+    status: TaskStatus
+    priority: TaskPriority
+    due_date: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    is_overdue: bool = False
+    client_id: int
+    assigned_to: Optional[int] = None
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ClientSummary(BaseModel):
+    id: int
+    name: str
+    nit: Optional[str] = None
+    arl_id: int
+    
+    class Config:
+        from_attributes = True
+
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    full_name: str
+    role: UserRole
+    client_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+class TaskSummaryList(BaseModel):
+    tasks: List[TaskSummary]
+    clients: Dict[int, ClientSummary]
+    users: Dict[int, UserSummary]
+
+# Tareas abiertas por vencer, agrupadas por asesor o cliente (GET /tasks/due)
+class DueTaskBucket(BaseModel):
+    count: int
+    tasks: List[TaskSummary]
+
+class DueTaskGroup(BaseModel):
+    group_id: Optional[int] = None
+    overdue: DueTaskBucket
+    today: DueTaskBucket
+    upcoming: DueTaskBucket
+
+class DueTaskList(BaseModel):
+    group_by: str
+    now: datetime
+    window_end: datetime
+    groups: List[DueTaskGroup]
+    clients: Dict[int, ClientSummary]
+    users: Dict[int, UserSummary]
+
 # Auth Schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,43 @@
+from sqlalchemy import String, and_, case, cast, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from app.database import async_engine
+from app.models import Task
+
+# Configuración de búsqueda de texto: español sin tildes (creada en la migración
+# 3f7a9c1e2d58 junto con la columna generada tasks.search_vector y su índice GIN)
+TASK_SEARCH_CONFIG = "es_unaccent"
+
+# Columna tsvector mantenida por PostgreSQL (GENERATED ALWAYS ... STORED); no se mapea
+# en el modelo porque solo existe en PostgreSQL y nunca se serializa
+search_vector = literal_column("tasks.search_vector", type_=TSVECTOR)
+
+def _search_terms(q: str) -> list:
+    return [term for term in q.split() if term]
+
+def _ts_query(q: str):
+    # websearch_to_tsquery acepta la sintaxis de buscador: "frase exacta", OR, -excluir
+    return func.websearch_to_tsquery(cast(TASK_SEARCH_CONFIG, REGCONFIG), q)
+
+def task_search_condition(q: str):
+    """Predicado de búsqueda sobre título, descripción y campos personalizados"""
+    if async_engine.dialect.name == "postgresql":
+        return search_vector.op("@@")(_ts_query(q))
+    # Alternativa sin índice para sqlite (desarrollo y pruebas): todos los términos deben aparecer
+    return and_(*[
+        or_(
+            Task.title.ilike(f"%{term}%"),
+            Task.description.ilike(f"%{term}%"),
+            cast(Task.custom_fields, String).ilike(f"%{term}%"),
+        )
+        for term in _search_terms(q)
+    ])
+
+def task_search_rank(q: str):
+    """Relevancia de cada tarea para q (mayor es mejor)"""
+    if async_engine.dialect.name == "postgresql":
+        return func.ts_rank_cd(search_vector, _ts_query(q))
+    # sqlite: cuenta los términos que aparecen en el título
+    rank = literal(0)
+    for term in _search_terms(q):
+        rank = rank + case((Task.title.ilike(f"%{term}%"), 1), else_=0)
+    return rank
@@ -0,0 +1,118 @@
+from enum import Enum
+from typing import Any, Optional
+import orjson
+from fastapi.responses import ORJSONResponse
+from app.models import ARL, Client, User, Task
+
+# Opciones de orjson: fechas UTC con sufijo Z igual que pydantic
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY
+
+class JSONResponse(ORJSONResponse):
+    """Respuesta JSON con orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+# Conversión directa de filas ORM a diccionarios con la misma forma que los esquemas
+# de app/schemas.py. Se usa en endpoints de listas con datos que vienen de la base de
+# datos (ya válidos), para no pagar la validación de pydantic por cada objeto anidado
+
+def _enum_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+def arl_to_dict(arl: ARL) -> dict:
+    return {
+        "name": arl.name,
+        "description": arl.description,
+        "id": arl.id,
+        "is_active": arl.is_active,
+        "created_at": arl.created_at,
+        "updated_at": arl.updated_at,
+    }
+
+def client_to_dict(client: Client) -> dict:
+    return {
+        "name": client.name,
+        "nit": client.nit,
+        "description": client.description,
+        "arl_id": client.arl_id,
+        "id": client.id,
+        "is_active": client.is_active,
+        "custom_fields_config": client.custom_fields_config,
+        "created_at": client.created_at,
+        "updated_at": client.updated_at,
+        "arl": arl_to_dict(client.arl),
+    }
+
+def user_to_dict(user: Optional[User], clients: dict = None) -> Optional[dict]:
+    if user is None:
+        return None
+    return {
+        "email": user.email,
+        "username": user.username,
+        "full_name": user.full_name,
+        "role": _enum_value(user.role),
+        "id": user.id,
+        "is_active": user.is_active,
+        "client_id": user.client_id,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+        "client": _cached_client_dict(user.client, clients),
+    }
+
+def _cached_client_dict(client: Optional[Client], clients: dict = None) -> Optional[dict]:
+    """Serializa cada cliente una sola vez por respuesta"""
+    if client is None:
+        return None
+    if clients is None:
+        return client_to_dict(client)
+    if client.id not in clients:
+        clients[client.id] = client_to_dict(client)
+    return clients[client.id]
+
+# Columnas grandes de Task que las listas solo cargan y envían si se piden con include=
+TASK_OPTIONAL_COLUMNS = ("description", "custom_fields")
+
+def task_to_dict(task: Task, clients: dict = None, users: dict = None, include=TASK_OPTIONAL_COLUMNS) -> dict:
+    if clients is None:
+        clients = {}
+    if users is None:
+        users = {}
+
+    def cached_user(user):
+        if user is None:
+            return None
+        if user.id not in users:
+            users[user.id] = user_to_dict(user, clients)
+        return users[user.id]
+
+    data = {"title": task.title}
+    if "description" in include:
+        data["description"] = task.description
+    data.update({
+        "status": _enum_value(task.status),
+        "priority": _enum_value(task.priority),
+        "due_date": task.due_date,
+    })
+    if "custom_fields" in include:
+        data["custom_fields"] = task.custom_fields
+    data.update({
+        "id": task.id,
+        "client_id": task.client_id,
+        "assigned_to": task.assigned_to,
+        "created_by": task.created_by,
+        "completed_at": task.completed_at,
+        "is_overdue": task.is_overdue,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "client": _cached_client_dict(task.client, clients),
+        "assigned_user": cached_user(task.assigned_user),
+        "created_by_user": cached_user(task.created_by_user),
+    })
+    return data
+
+def tasks_to_list(tasks, include=TASK_OPTIONAL_COLUMNS) -> list:
+    """Serializa una lista de tareas reutilizando los diccionarios de clientes y usuarios repetidos"""
+    clients = {}
+    users = {}
+    return [task_to_dict(task, clients, users, include) for task in tasks]
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app.json_import import EXPORT_SECTIONS, insert_rows, reset_sequences
+from app.models import ARL, Client, User, Task, TaskStatsRollup
+from app.stats import rebuild_task_stats_rollup
+
+# Instantáneas de la base de datos en bloques NDJSON por tabla (un archivo cada
+# SNAPSHOT_CHUNK_ROWS filas) más un manifest.json con filas y sha256 de cada bloque.
+# Las filas tienen la misma forma que los elementos de complete_local_data_export_*.json
+
+SNAPSHOT_CHUNK_ROWS = 50000
+
+# Procesos que cargan bloques en paralelo (cada uno con su propia conexión)
+SNAPSHOT_WORKERS = os.cpu_count() or 1
+
+SNAPSHOT_FORMAT = "task_tracker_snapshot"
+
+SNAPSHOT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+
+# Columnas exportadas de cada tabla (en el orden de claves foráneas de EXPORT_SECTIONS)
+SNAPSHOT_COLUMNS: Dict[str, List[str]] = {
+    "arls": ["id", "name", "description", "is_active", "created_at", "updated_at"],
+    "clients": [
+        "id", "name", "nit", "description", "is_active", "arl_id",
+        "custom_fields_config", "created_at", "updated_at",
+    ],
+    "users": [
+        "id", "email", "username", "full_name", "hashed_password", "role",
+        "is_active", "client_id", "token_version", "created_at", "updated_at",
+    ],
+    "tasks": [
+        "id", "title", "description", "status", "priority", "due_date", "completed_at",
+        "client_id", "assigned_to", "created_by", "custom_fields", "created_at", "updated_at",
+    ],
+}
+
+def dump_row(row: dict) -> bytes:
+    # orjson serializa los enums con su valor y las fechas en ISO 8601 (igual que isoformat())
+    return orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS)
+
+def begin_snapshot(db: Session):
+    """Todas las tablas se leen en una misma transacción REPEATABLE READ (PostgreSQL)"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+def iter_table_chunks(db: Session, name: str, chunk_rows: int = SNAPSHOT_CHUNK_ROWS) -> Iterator[List[dict]]:
+    """Filas de la tabla en bloques de chunk_rows, leídas con un cursor del lado del servidor"""
+    table, _ = EXPORT_SECTIONS[name]
+    columns = SNAPSHOT_COLUMNS[name]
+    result = db.execute(
+        select(*[table.c[column] for column in columns])
+        .order_by(table.c.id)
+        .execution_options(yield_per=chunk_rows)
+    )
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+def write_snapshot(
+    db: Session,
+    directory: str,
+    chunk_rows: int = SNAPSHOT_CHUNK_ROWS,
+    progress: Callable[[str, int], None] = None,
+) -> dict:
+    """Escribe la instantánea en directory y retorna el manifiesto (se escribe al final)"""
+    os.makedirs(directory, exist_ok=True)
+    begin_snapshot(db)
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "export_timestamp": datetime.now().isoformat(),
+        "chunk_rows": chunk_rows,
+        "tables": {},
+    }
+    
+    for name in EXPORT_SECTIONS:
+        chunks = []
+        for number, rows in enumerate(iter_table_chunks(db, name, chunk_rows)):
+            file_name = f"{name}-{number:05d}.ndjson"
+            data = b"".join(dump_row(row) + b"\n" for row in rows)
+            with open(os.path.join(directory, file_name), "wb") as f:
+                f.write(data)
+            # Las filas van ordenadas por id: cada bloque es un rango de ids disjunto
+            chunks.append({
+                "file": file_name,
+                "rows": len(rows),
+                "min_id": rows[0]["id"],
+                "max_id": rows[-1]["id"],
+                "sha256": hashlib.sha256(data).hexdigest(),
+            })
+            if progress:
+                progress(name, sum(chunk["rows"] for chunk in chunks))
+        manifest["tables"][name] = {"rows": sum(chunk["rows"] for chunk in chunks), "chunks": chunks}
+    
+    # Sin manifest.json la instantánea está incompleta y no se puede cargar
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    db.rollback()
+    return manifest
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{directory} no es una instantánea versión {SNAPSHOT_VERSION}")
+    return manifest
+
+def read_chunk(directory: str, chunk: dict) -> List[dict]:
+    """Filas de un bloque, verificando su sha256 y número de filas"""
+    with open(os.path.join(directory, chunk["file"]), "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != chunk["sha256"]:
+        raise ValueError(f"Checksum inválido en {chunk['file']}")
+    rows = [orjson.loads(line) for line in data.splitlines() if line]
+    if len(rows) != chunk["rows"]:
+        raise ValueError(f"{chunk['file']} tiene {len(rows)} filas y el manifiesto indica {chunk['rows']}")
+    return rows
+
+def _load_chunk(directory: str, name: str, chunk: dict) -> int:
+    # Se ejecuta en un proceso del pool: SessionLocal usa el engine creado en ese proceso
+    table, to_row = EXPORT_SECTIONS[name]
+    rows = [to_row(item) for item in read_chunk(directory, chunk)]
+    db = SessionLocal()
+    try:
+        loaded = insert_rows(db, table, rows)
+        db.commit()
+        return loaded
+    finally:
+        db.close()
+
+def load_snapshot(
+    directory: str,
+    workers: int = SNAPSHOT_WORKERS,
+    progress: Callable[[str, int, int], None] = None,
+) -> Dict[str, int]:
+    """
+    Carga la instantánea conservando los ids. Cada tabla termina antes de empezar la
+    siguiente (ARLs → clientes → usuarios → tareas); los bloques de una tabla (rangos de
+    ids) se cargan en paralelo en un pool de workers procesos. Las filas que ya existen
+    (mismo id) se omiten, así que volver a ejecutarla tras un corte completa la carga.
+    Retorna las filas leídas por tabla
+    """
+    manifest = read_manifest(directory)
+    pool = None
+    # sqlite no admite escrituras concurrentes: se carga en este mismo proceso
+    if workers > 1 and engine.dialect.name == "postgresql":
+        # spawn: los procesos no heredan las conexiones abiertas del pool de este proceso
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    
+    loaded = {}
+    try:
+        for name in EXPORT_SECTIONS:
+            chunks = manifest["tables"][name]["chunks"]
+            total = manifest["tables"][name]["rows"]
+            loaded[name] = 0
+            if pool:
+                results = as_completed([pool.submit(_load_chunk, directory, name, chunk) for chunk in chunks])
+                results = (future.result() for future in results)
+            else:
+                results = (_load_chunk(directory, name, chunk) for chunk in chunks)
+            for rows in results:
+                loaded[name] += rows
+                if progress:
+                    progress(name, loaded[name], total)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    
+    db = SessionLocal()
+    try:
+        reset_sequences(db)
+        rebuild_task_stats_rollup(db)
+        db.commit()
+    finally:
+        db.close()
+    return loaded
+
+def _missing_references(db: Session, column, target_column) -> int:
+    return db.scalar(
+        select(func.count()).where(column.is_not(None), ~column.in_(select(target_column)))
+    )
+
+def check_snapshot_load(db: Session, manifest: dict) -> List[str]:
+    """Problemas encontrados al comparar la base con el manifiesto (lista vacía si todo coincide)"""
+    problems = []
+    for name, info in manifest["tables"].items():
+        table, _ = EXPORT_SECTIONS[name]
+        for chunk in info["chunks"]:
+            rows = db.scalar(
+                select(func.count()).select_from(table)
+                .where(table.c.id.between(chunk["min_id"], chunk["max_id"]))
+            )
+            if rows != chunk["rows"]:
+                problems.append(f"{chunk['file']}: {rows} filas en la base, {chunk['rows']} en el manifiesto")
+    
+    # Referencias rotas (sqlite no verifica las claves foráneas)
+    references = {
+        "clients.arl_id": (Client.arl_id, ARL.id),
+        "users.client_id": (User.client_id, Client.id),
+        "tasks.client_id": (Task.client_id, Client.id),
+        "tasks.assigned_to": (Task.assigned_to, User.id),
+        "tasks.created_by": (Task.created_by, User.id),
+    }
+    for label, (column, target_column) in references.items():
+        missing = _missing_references(db, column, target_column)
+        if missing:
+            problems.append(f"{label}: {missing} filas apuntan a registros inexistentes")
+    
+    tasks = db.scalar(select(func.count(Task.id)))
+    rollup = db.scalar(select(func.coalesce(func.sum(TaskStatsRollup.task_count), 0)))
+    if rollup != tasks:
+        problems.append(f"task_stats_rollup suma {rollup} tareas y tasks tiene {tasks}")
+    return problems
+
+def write_json_export(db: Session, file_name: str, source: str = None, chunk_rows: int = SNAPSHOT_CHUNK_ROWS) -> dict:
+    """
+    Escribe el archivo JSON de exportación (arls, clients, users, tasks y summary) fila por
+    fila, sin construir las listas completas en memoria. Retorna el resumen
+    """
+    begin_snapshot(db)
+    summary = {}
+    with open(file_name, "wb") as f:
+        f.write(b'{\n  "export_timestamp": ' + orjson.dumps(datetime.now().isoformat()))
+        if source is not None:
+            f.write(b',\n  "source": ' + orjson.dumps(source))
+        for name in EXPORT_SECTIONS:
+            f.write(b',\n  "' + name.encode() + b'": [')
+            count = 0
+            for rows in iter_table_chunks(db, name, chunk_rows):
+                for row in rows:
+                    f.write((b",\n    " if count else b"\n    ") + dump_row(row))
+                    count += 1
+            f.write(b"\n  ]" if count else b"]")
+            summary[f"total_{name}"] = count
+        f.write(b',\n  "summary": ' + orjson.dumps(summary) + b"\n}\n")
+    db.rollback()
+    return summary
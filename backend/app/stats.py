@@ -0,0 +1,220 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import func, and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Task, TaskStatus, TaskStatsRollup
+from app.schemas import TaskStats
+
+# Estados que se consideran abiertos para el cálculo de tareas vencidas
+OPEN_STATUSES = ["pendiente", "en_progreso"]
+
+def overdue_condition(now: datetime = None):
+    """Predicado de tarea vencida (pendiente o en progreso con fecha de vencimiento pasada)"""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return and_(Task.status.in_(OPEN_STATUSES), Task.due_date < now)
+
+def task_is_overdue(status, due_date: Optional[datetime], now: datetime = None) -> bool:
+    """Valor de tasks.is_overdue para una tarea con este estado y fecha de vencimiento"""
+    if due_date is None or _normalize_status(status) not in (TaskStatus.PENDIENTE, TaskStatus.EN_PROGRESO):
+        return False
+    if now is None:
+        now = datetime.now(timezone.utc)
+    # Las fechas sin zona horaria (sqlite, clientes) se interpretan como UTC
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    return due_date < now
+
+# updated_at=Task.updated_at evita el onupdate: el paso del tiempo no es una edición de la tarea
+def mark_overdue_statement(now: datetime):
+    """UPDATE que marca las tareas que vencieron desde la última revisión (usa ix_tasks_pending_overdue)"""
+    return (
+        update(Task)
+        .where(Task.is_overdue == False, overdue_condition(now))
+        .values(is_overdue=True, updated_at=Task.updated_at)
+        .returning(Task.id, Task.client_id, Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )
+
+def clear_overdue_statement(now: datetime):
+    """UPDATE que desmarca las tareas marcadas que ya no están vencidas (usa ix_tasks_overdue)"""
+    return (
+        update(Task)
+        .where(
+            Task.is_overdue == True,
+            or_(~Task.status.in_(OPEN_STATUSES), Task.due_date.is_(None), Task.due_date >= now)
+        )
+        .values(is_overdue=False, updated_at=Task.updated_at)
+        .returning(Task.id, Task.client_id, Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )
+
+def task_stats_columns():
+    """Columnas de agregación condicional sobre task_stats_rollup con los contadores por estado"""
+    task_count = TaskStatsRollup.task_count
+    return [
+        func.coalesce(func.sum(task_count), 0).label("total_tasks"),
+        func.coalesce(func.sum(task_count).filter(TaskStatsRollup.status == "pendiente"), 0).label("pending_tasks"),
+        func.coalesce(func.sum(task_count).filter(TaskStatsRollup.status == "en_progreso"), 0).label("in_progress_tasks"),
+        func.coalesce(func.sum(task_count).filter(TaskStatsRollup.status == "completada"), 0).label("completed_tasks"),
+    ]
+
+def row_to_task_stats(row) -> TaskStats:
+    """Convierte una fila con las columnas de task_stats_columns y overdue_tasks en TaskStats"""
+    if row is None:
+        return TaskStats(
+            total_tasks=0,
+            pending_tasks=0,
+            in_progress_tasks=0,
+            completed_tasks=0,
+            overdue_tasks=0
+        )
+    return TaskStats(
+        total_tasks=row.total_tasks or 0,
+        pending_tasks=row.pending_tasks or 0,
+        in_progress_tasks=row.in_progress_tasks or 0,
+        completed_tasks=row.completed_tasks or 0,
+        overdue_tasks=row.overdue_tasks or 0
+    )
+
+async def compute_task_stats(db: AsyncSession, client_id: int = None, assigned_to: int = None) -> TaskStats:
+    """Calcula las estadísticas de tareas leyendo el rollup en lugar de recorrer tasks"""
+    rollup_criteria = []
+    task_criteria = []
+    if client_id:
+        rollup_criteria.append(TaskStatsRollup.client_id == client_id)
+        task_criteria.append(Task.client_id == client_id)
+    if assigned_to:
+        rollup_criteria.append(TaskStatsRollup.assigned_to == assigned_to)
+        task_criteria.append(Task.assigned_to == assigned_to)
+    
+    # Las vencidas se cuentan con la marca is_overdue (índice parcial ix_tasks_overdue),
+    # como subconsulta escalar de la misma consulta
+    overdue_tasks = (
+        select(func.count(Task.id))
+        .where(Task.is_overdue == True, *task_criteria)
+        .scalar_subquery()
+    )
+    row = (await db.execute(
+        select(*task_stats_columns(), overdue_tasks.label("overdue_tasks")).where(*rollup_criteria)
+    )).one()
+    return row_to_task_stats(row)
+
+async def compute_task_stats_by_client(db: AsyncSession, client_ids: List[int]) -> Dict[int, TaskStats]:
+    """Calcula las estadísticas de tareas de varios clientes en una consulta agrupada"""
+    rollup = (
+        select(TaskStatsRollup.client_id, *task_stats_columns())
+        .where(TaskStatsRollup.client_id.in_(client_ids))
+        .group_by(TaskStatsRollup.client_id)
+        .subquery()
+    )
+    overdue = (
+        select(Task.client_id, func.count(Task.id).label("overdue_tasks"))
+        .where(Task.is_overdue == True, Task.client_id.in_(client_ids))
+        .group_by(Task.client_id)
+        .subquery()
+    )
+    # Toda tarea vencida está en el rollup de su cliente: basta un LEFT JOIN desde el rollup
+    rows = (await db.execute(
+        select(rollup, overdue.c.overdue_tasks)
+        .outerjoin(overdue, overdue.c.client_id == rollup.c.client_id)
+    )).all()
+    rows_by_client = {row.client_id: row for row in rows}
+    return {
+        client_id: row_to_task_stats(rows_by_client.get(client_id))
+        for client_id in client_ids
+    }
+
+def _normalize_status(status) -> Optional[TaskStatus]:
+    if status is None:
+        return None
+    return TaskStatus(status)
+
+def rollup_key(client_id: int, assigned_to: Optional[int], status):
+    """Clave (cliente, usuario asignado, estado) en el rollup"""
+    return (client_id, assigned_to, _normalize_status(status))
+
+def task_rollup_key(task: Task):
+    """Clave de una tarea en el rollup"""
+    return rollup_key(task.client_id, task.assigned_to, task.status)
+
+async def apply_rollup_delta(db: AsyncSession, client_id: int, assigned_to: Optional[int], status, delta: int):
+    """Suma delta al contador del rollup; no hace commit, participa en la transacción del llamador"""
+    if delta == 0:
+        return
+    status = _normalize_status(status)
+    criteria = [
+        TaskStatsRollup.client_id == client_id,
+        TaskStatsRollup.assigned_to == assigned_to,
+        TaskStatsRollup.status == status,
+    ]
+    increment = (
+        update(TaskStatsRollup)
+        .where(*criteria)
+        .values(task_count=TaskStatsRollup.task_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(increment)
+    if result.rowcount:
+        return
+    
+    # No existe la fila: crearla en un savepoint por si otra transacción la inserta a la vez
+    try:
+        async with db.begin_nested():
+            db.add(TaskStatsRollup(
+                client_id=client_id,
+                assigned_to=assigned_to,
+                status=status,
+                task_count=delta
+            ))
+    except IntegrityError:
+        await db.execute(increment)
+
+async def record_task_rollup_change(db: AsyncSession, old_key=None, new_key=None):
+    """Actualiza el rollup al pasar una tarea de old_key a new_key (None para creación/eliminación)"""
+    if old_key == new_key:
+        return
+    deltas = {}
+    if old_key is not None:
+        deltas[old_key] = -1
+    if new_key is not None:
+        deltas[new_key] = 1
+    await apply_rollup_deltas(db, deltas)
+
+def _rollup_lock_order(key: tuple) -> tuple:
+    """Clave de orden total para (client_id, assigned_to, status), con assigned_to o status en None"""
+    client_id, assigned_to, status = key
+    return (client_id, assigned_to is None, assigned_to or 0, status.value if status else "")
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Dict[tuple, int]):
+    """Aplica los cambios acumulados por clave de rollup de una operación masiva"""
+    # Siempre en el mismo orden de claves: dos transacciones que actualizan las mismas filas
+    # del rollup las bloquean en el mismo orden y no pueden quedar en deadlock
+    for key in sorted(deltas, key=_rollup_lock_order):
+        await apply_rollup_delta(db, *key, deltas[key])
+
+def rebuild_task_stats_rollup(db: Session) -> int:
+    """Reconstruye task_stats_rollup (y la marca is_overdue) desde tasks; no hace commit. Retorna el número de filas"""
+    # Las sesiones no hacen autoflush: las tareas pendientes del script deben llegar a la base antes de agrupar
+    db.flush()
+    # Los scripts de importación insertan tareas sin calcular is_overdue
+    now = datetime.now(timezone.utc)
+    db.execute(mark_overdue_statement(now))
+    db.execute(clear_overdue_statement(now))
+    db.query(TaskStatsRollup).delete(synchronize_session=False)
+    rows = db.query(
+        Task.client_id, Task.assigned_to, Task.status, func.count(Task.id)
+    ).group_by(Task.client_id, Task.assigned_to, Task.status).all()
+    db.add_all([
+        TaskStatsRollup(
+            client_id=client_id,
+            assigned_to=assigned_to,
+            status=status,
+            task_count=task_count
+        )
+        for client_id, assigned_to, status, task_count in rows
+    ])
+    db.flush()
+    return len(rows)
@@ -8,11 +8,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
-from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
-from app.models import Base, ARL, Client, User, Task, TaskStatus, TaskPriority, UserRole
-from app.auth import get_password_hash
-from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models import ARL, User, Task
+from app.stats import rebuild_task_stats_rollup
+from app.excel_import import ASSIGNMENT_SHEETS, resolve_sheet_assignments, assign_tasks
 
 def assign_tasks_to_responsibles():
     """Asignar tareas a los usuarios responsables correspondientes"""
@@ -27,121 +26,29 @@ def assign_tasks_to_responsibles():
         if not colmena_arl or not positiva_arl:
             print("Error: Las ARLs no existen")
             return
-        
-        # Asignar tareas de COLMENA ARL
-        print("=== ASIGNANDO TAREAS DE COLMENA ARL ===")
-        colmena_file = "Files/Estado de Tareas_COLMENA ARL.xlsx"
-        if os.path.exists(colmena_file):
-            df_colmena = pd.read_excel(colmena_file)
-            
-            assigned_count = 0
-            for index, row in df_colmena.iterrows():
-                try:
-                    # Obtener datos de la fila
-                    empresa = row['EMPRESA']
-                    actividad = row['ACTIVIDAD']
-                    asesor_asignado = row.get('ASESOR ASIGNADO')
-                    
-                    if pd.isna(empresa) or pd.isna(actividad):
-                        continue
-                    
-                    # Buscar el cliente
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == colmena_arl.id
-                    ).first()
-                    
-                    if not client:
-                        continue
-                    
-                    # Buscar la tarea
-                    task = db.query(Task).filter(
-                        Task.title.like(f"%{actividad[:50]}%"),
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if not task:
-                        continue
-                    
-                    # Buscar el usuario asesor
-                    if not pd.isna(asesor_asignado):
-                        # Crear username del asesor
-                        username = asesor_asignado.lower().replace(' ', '_').replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-                        
-                        # Buscar el usuario
-                        user = db.query(User).filter(User.username == username).first()
-                        
-                        if user:
-                            task.assigned_to = user.id
-                            assigned_count += 1
-                            print(f"  ✓ Asignada: {actividad[:50]}... → {user.full_name}")
-                        else:
-                            print(f"  ⚠ Usuario no encontrado: {asesor_asignado}")
-                    
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
-            db.commit()
-            print(f"✓ Asignadas {assigned_count} tareas de COLMENA ARL")
-        
-        # Asignar tareas de POSITIVA ARL
-        print("\n=== ASIGNANDO TAREAS DE POSITIVA ARL ===")
-        positiva_file = "Files/Estado de Tareas_POSITIVA ARL.xlsx"
-        if os.path.exists(positiva_file):
-            df_positiva = pd.read_excel(positiva_file)
-            
-            assigned_count = 0
-            for index, row in df_positiva.iterrows():
-                try:
-                    # Obtener datos de la fila
-                    empresa = row['EMPRESA']
-                    actividad = row['ACTIVIDAD']
-                    asesor = row.get('ASESOR')
-                    
-                    if pd.isna(empresa) or pd.isna(actividad):
-                        continue
-                    
-                    # Buscar el cliente
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == positiva_arl.id
-                    ).first()
-                    
-                    if not client:
-                        continue
-                    
-                    # Buscar la tarea
-                    task = db.query(Task).filter(
-                        Task.title.like(f"%{actividad[:50]}%"),
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if not task:
-                        continue
-                    
-                    # Buscar el usuario asesor
-                    if not pd.isna(asesor):
-                        # Crear username del asesor
-                        username = f"{asesor.lower()}_positiva"
-                        
-                        # Buscar el usuario
-                        user = db.query(User).filter(User.username == username).first()
-                        
-                        if user:
-                            task.assigned_to = user.id
-                            assigned_count += 1
-                            print(f"  ✓ Asignada: {actividad[:50]}... → {user.full_name}")
-                        else:
-                            print(f"  ⚠ Usuario no encontrado: {asesor}")
-                    
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
+    
+        for sheet in ASSIGNMENT_SHEETS:
+            print(f"=== ASIGNANDO TAREAS DE {sheet['arl']} ===")
+            if not os.path.exists(sheet["file"]):
+                continue
+            arl = colmena_arl if sheet["arl"] == "COLMENA ARL" else positiva_arl
+            df = pd.read_excel(sheet["file"])
+    
+            # Cliente, tarea y usuario de todas las filas con un par de consultas
+            rows = resolve_sheet_assignments(db, df, arl.id, sheet["advisor"], sheet["suffix"])
+            rows = rows[rows["task_id"].notna()]
+            found = rows[rows["user_id"].notna()]
+            for row in found.itertuples():
+                print(f"  ✓ Asignada: {row.actividad[:50]}... → {row.asesor}")
+            for asesor in rows.loc[rows["user_id"].isna(), "asesor"].unique():
+                print(f"  ⚠ Usuario no encontrado: {asesor}")
+    
+            assigned_count = assign_tasks(db, found["task_id"], found["user_id"])
+            # Actualizar las estadísticas precalculadas del dashboard (dependen del usuario asignado)
+            rebuild_task_stats_rollup(db)
             db.commit()
-            print(f"✓ Asignadas {assigned_count} tareas de POSITIVA ARL")
-        
+            print(f"✓ Asignadas {assigned_count} tareas de {sheet['arl']}\n")
+    
         # Mostrar resumen final
         print("\n=== RESUMEN FINAL ===")
         total_tasks = db.query(Task).count()
@@ -11,6 +11,7 @@ import pandas as pd
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import User, Task, Company
+from app.stats import rebuild_task_stats_rollup
 from sqlalchemy import and_
 
 def assign_users_to_tasks():
@@ -107,6 +108,9 @@ def assign_users_to_tasks():
             
             print(f"   📊 Tareas asignadas en POSITIVA ARL: {assigned_count}")
         
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(db)
+        
         # Confirmar cambios
         db.commit()
         
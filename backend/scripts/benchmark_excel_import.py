@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Script para medir la normalización de una hoja sintética de actividades (por defecto
+100k filas) fila por fila con iterrows (ruta anterior) y con pandas vectorizado (ruta actual)
+"""
+
+import sys
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from app.models import TaskStatus, TaskPriority
+from import_activities_from_excel import ARL_SHEETS, build_task_records
+
+POSITIVA_SHEET = next(sheet for sheet in ARL_SHEETS if sheet["arl"] == "POSITIVA ARL")
+
+def build_sheet(rows: int, clients: int = 200) -> pd.DataFrame:
+    """Hoja con las columnas de POSITIVA ARL y valores variados (fechas en texto, vacíos, estados)"""
+    rng = np.random.default_rng(42)
+    start = datetime(2025, 1, 1)
+    due_dates = [start + timedelta(days=int(days)) for days in rng.integers(0, 365, rows)]
+    return pd.DataFrame({
+        "EMPRESA": [f"EMPRESA {i % clients}" for i in range(rows)],
+        "ACTIVIDAD": [f"Asesoría para el diseño y desarrollo del programa {i}" for i in range(rows)],
+        "NIT": rng.integers(800000000, 999999999, rows).astype(float),
+        "CODIGO": [f"0-PA-PGCIA-AC-{i}" for i in range(rows)],
+        "No. Aut": rng.random(rows) * 100000,
+        "Id Actividad": np.where(rng.random(rows) < 0.1, np.nan, rng.integers(1, 10 ** 6, rows)),
+        "MES": rng.choice(["ENE", "FEB", "MAR", "AGO"], rows),
+        "EIS": rng.choice(["Javier", "Laura", None], rows),
+        "ASESOR": rng.choice(["Carlos", "Maria José", "Luz", "Ana", "Otoniel"], rows),
+        "OBSERVACIONES": rng.choice(["Sep 9(2H)", "PARA CANCELAR", None], rows),
+        "ESTADO": rng.choice(["Finalizada", "En proceso", "Pendiente", "Anulada", None], rows),
+        "HORAS ASIGNADAS": rng.choice([2, 20, 60, 120, np.nan], rows),
+        "PENDIENTES POR REGISTRAR DESDE APP": rng.integers(0, 5, rows).astype(float),
+        "FECHA MÁXIMA DE EJECUCIÓN": [
+            date.strftime("%d/%m/%Y") if i % 3 == 0 else date for i, date in enumerate(due_dates)
+        ],
+    })
+
+def legacy_status(estado):
+    estado = "" if pd.isna(estado) else str(estado).lower()
+    if 'completada' in estado or 'finalizada' in estado or 'terminada' in estado:
+        return TaskStatus.COMPLETADA
+    if 'en progreso' in estado or 'en proceso' in estado or 'ejecutando' in estado:
+        return TaskStatus.EN_PROGRESO
+    if 'cancelada' in estado or 'anulada' in estado:
+        return TaskStatus.CANCELADA
+    return TaskStatus.PENDIENTE
+
+def legacy_priority(horas):
+    horas = 0 if pd.isna(horas) else horas
+    try:
+        horas = float(horas)
+    except (TypeError, ValueError):
+        return TaskPriority.MEDIA
+    if horas >= 100:
+        return TaskPriority.CRITICA
+    if horas >= 50:
+        return TaskPriority.ALTA
+    if horas >= 20:
+        return TaskPriority.MEDIA
+    return TaskPriority.BAJA
+
+def legacy_date(value):
+    if pd.isna(value) or value == '':
+        return None
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value, '%d/%m/%Y' if '/' in value else '%Y-%m-%d')
+        except ValueError:
+            return None
+    return value
+
+def legacy_build_records(df, sheet, client_ids, admin_user_id):
+    """Ruta anterior: iterrows y funciones por fila"""
+    records = []
+    for _, row in df.iterrows():
+        client_id = client_ids.get(row['EMPRESA'])
+        if client_id is None or pd.isna(row['ACTIVIDAD']):
+            continue
+        description = "\n".join(
+            f"{label}: {row[name]}" for label, name in sheet["description"]
+            if name in row and not pd.isna(row[name])
+        )
+        records.append({
+            "title": str(row['ACTIVIDAD'])[:200],
+            "description": description or "Actividad importada desde Excel",
+            "status": legacy_status(row.get('ESTADO')),
+            "priority": legacy_priority(row.get('HORAS ASIGNADAS', 0)),
+            "due_date": legacy_date(row.get(sheet["due_date"])),
+            "client_id": client_id,
+            "created_by": admin_user_id,
+            "custom_fields": {
+                name: str(row[source]) for name, source in sheet["custom_fields"].items()
+                if source in row and not pd.isna(row[source])
+            },
+        })
+    return records
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de normalización de hojas de Excel")
+    parser.add_argument("--rows", type=int, default=100000, help="Filas de la hoja sintética")
+    parser.add_argument("--legacy-rows", type=int, default=10000,
+                        help="Filas medidas con la ruta anterior (se extrapola al total)")
+    parser.add_argument("--xlsx", action="store_true", help="Escribir y leer la hoja como .xlsx")
+    args = parser.parse_args()
+    
+    df = build_sheet(args.rows)
+    client_ids = {f"EMPRESA {i}": i + 1 for i in range(200)}
+    
+    if args.xlsx:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "actividades.xlsx")
+            write_seconds, _ = measure(df.to_excel, path, index=False)
+            read_seconds, df = measure(pd.read_excel, path)
+        print(f"📄 Hoja .xlsx de {args.rows} filas: escritura {write_seconds:.1f} s, lectura {read_seconds:.1f} s")
+    
+    legacy_rows = min(args.legacy_rows, len(df))
+    legacy_seconds, _ = measure(legacy_build_records, df.head(legacy_rows), POSITIVA_SHEET, client_ids, 1)
+    legacy_total = legacy_seconds * len(df) / legacy_rows
+    vectorized_seconds, tasks = measure(build_task_records, df, POSITIVA_SHEET, client_ids, 1)
+    
+    print(f"📊 Normalización de {len(df)} filas ({len(tasks)} tareas):")
+    print(f"   iterrows (estimado con {legacy_rows} filas): {legacy_total:.2f} s")
+    print(f"   pandas vectorizado:                  {vectorized_seconds:.2f} s")
+    print(f"   mejora:                              {legacy_total / vectorized_seconds:.1f}x")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script para medir el costo de bcrypt en esta máquina y recomendar BCRYPT_ROUNDS
+según el presupuesto de latencia del login
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.hashing import BcryptHasher
+
+def measure_verify_ms(rounds: int, samples: int) -> float:
+    """Tiempo medio (ms) de una verificación bcrypt con el costo dado"""
+    hasher = BcryptHasher(rounds=rounds)
+    hashed = hasher.hash("benchmark-password")
+    start = time.perf_counter()
+    for _ in range(samples):
+        hasher.verify("benchmark-password", hashed)
+    return (time.perf_counter() - start) / samples * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bcrypt para ajustar BCRYPT_ROUNDS")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("LOGIN_HASH_BUDGET_MS", "250")),
+                        help="Tiempo máximo de verificación por login (ms)")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=15)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"⏱️ Midiendo bcrypt (presupuesto: {args.budget_ms:.0f} ms por verificación)...")
+    recommended = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed_ms = measure_verify_ms(rounds, args.samples)
+        within_budget = elapsed_ms <= args.budget_ms
+        print(f"   rounds={rounds}: {elapsed_ms:.1f} ms {'✅' if within_budget else '❌'}")
+        if not within_budget:
+            break
+        recommended = rounds
+    
+    if recommended is None:
+        print(f"❌ Ningún costo desde {args.min_rounds} cumple el presupuesto")
+        return False
+    print(f"✅ Recomendado: BCRYPT_ROUNDS={recommended}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Script para comparar el costo de CPU de serializar una página de tareas con
+pydantic + json (ruta anterior) y con diccionarios directos + orjson (ruta actual)
+"""
+
+import sys
+import os
+import time
+import json
+import argparse
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from app.models import ARL, Client, User, Task, TaskStatus, TaskPriority, UserRole
+from app.schemas import Task as TaskSchema
+from app.serialization import JSONResponse, tasks_to_list
+
+def build_tasks(count: int, clients_count: int = 2, users_count: int = 20):
+    """Construye tareas en memoria (sin base de datos) con sus relaciones"""
+    now = datetime.now(timezone.utc)
+    arl = ARL(id=1, name="COLMENA ARL", description=None, is_active=True, created_at=now)
+    clients = [
+        Client(id=i + 1, name=f"Cliente {i + 1}", nit="900000000", description=None, is_active=True,
+               arl_id=1, arl=arl, custom_fields_config=[], created_at=now)
+        for i in range(clients_count)
+    ]
+    users = [
+        User(id=i + 1, email=f"user{i + 1}@example.com", username=f"user{i + 1}", full_name=f"Usuario {i + 1}",
+             role=UserRole.USER, is_active=True, client_id=clients[i % clients_count].id,
+             client=clients[i % clients_count], created_at=now)
+        for i in range(users_count)
+    ]
+    tasks = []
+    for i in range(count):
+        user = users[i % users_count]
+        tasks.append(Task(
+            id=i + 1, title=f"Actividad {i + 1}", description="Actividad importada desde Excel",
+            status=TaskStatus.PENDIENTE, priority=TaskPriority.MEDIA, due_date=now + timedelta(days=i % 30),
+            is_overdue=False, client_id=user.client_id, client=user.client, assigned_to=user.id, assigned_user=user,
+            created_by=users[0].id, created_by_user=users[0],
+            custom_fields={"programa": "Programa", "ciudad_desarrollo": "Bogotá"}, created_at=now
+        ))
+    return tasks
+
+def serialize_pydantic(tasks) -> bytes:
+    """Ruta anterior: validación con response_model + jsonable_encoder + json estándar"""
+    validated = [TaskSchema.model_validate(task) for task in tasks]
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def serialize_direct(tasks) -> bytes:
+    """Ruta actual: diccionarios directos desde el ORM + orjson"""
+    return JSONResponse(tasks_to_list(tasks)).body
+
+def measure_cpu_ms(function, tasks, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        function(tasks)
+    return (time.process_time() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de tareas")
+    parser.add_argument("--tasks", type=int, default=100, help="Tareas por respuesta")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    tasks = build_tasks(args.tasks)
+    before_ms = measure_cpu_ms(serialize_pydantic, tasks, args.repeat)
+    after_ms = measure_cpu_ms(serialize_direct, tasks, args.repeat)
+    
+    print(f"📊 CPU por respuesta de {args.tasks} tareas (promedio de {args.repeat}):")
+    print(f"   pydantic + json:        {before_ms:.2f} ms")
+    print(f"   diccionarios + orjson:  {after_ms:.2f} ms")
+    print(f"   mejora:                 {before_ms / after_ms:.1f}x")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import Task
+from app.stats import rebuild_task_stats_rollup
 
 def clean_and_reimport():
     """Limpiar tareas existentes y volver a importar"""
@@ -24,6 +25,7 @@ def clean_and_reimport():
         # Eliminar todas las tareas existentes
         print("Eliminando tareas existentes...")
         db.query(Task).delete()
+        rebuild_task_stats_rollup(db)
         db.commit()
         print("✓ Tareas eliminadas")
         
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script para exportar una instantánea de la base de datos en bloques NDJSON por tabla
+(con manifest.json de filas y checksums), en memoria acotada sin importar el tamaño de la base
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.snapshot import SNAPSHOT_CHUNK_ROWS, write_snapshot
+
+def print_progress(table, rows):
+    print(f"   📦 {table}: {rows} filas")
+
+def export_snapshot(directory, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+    """Exportar la instantánea al directorio indicado"""
+    print(f"📤 Exportando instantánea a: {directory}")
+    
+    db = SessionLocal()
+    try:
+        manifest = write_snapshot(db, directory, chunk_rows=chunk_rows, progress=print_progress)
+        
+        print("✅ Instantánea exportada exitosamente")
+        print("📊 Resumen de exportación:")
+        for table, info in manifest['tables'].items():
+            print(f"   - {table}: {info['rows']} filas en {len(info['chunks'])} bloques")
+        
+        return manifest
+    
+    except Exception as e:
+        print(f"❌ Error exportando instantánea: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportar una instantánea NDJSON por bloques")
+    parser.add_argument("directory", nargs="?",
+                        default=f"snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                        help="Directorio de salida")
+    parser.add_argument("--chunk-rows", type=int, default=SNAPSHOT_CHUNK_ROWS, help="Filas por archivo")
+    args = parser.parse_args()
+    
+    export_snapshot(args.directory, chunk_rows=args.chunk_rows)
@@ -8,11 +8,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
-from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
-from app.models import Base, ARL, Client, User, Task, TaskStatus, TaskPriority, UserRole
+from app.database import SessionLocal
+from app.models import ARL, Client, User, Task, UserRole
 from app.auth import get_password_hash
-from datetime import datetime, timedelta
+from app.stats import rebuild_task_stats_rollup
+from app.excel_import import ASSIGNMENT_SHEETS, resolve_sheet_assignments, assign_tasks
+from sqlalchemy import update
 
 def fix_task_assignments():
     """Corregir las asignaciones de tareas basándose en los asesores reales"""
@@ -33,15 +34,15 @@ def fix_task_assignments():
         # Primero, limpiar todas las asignaciones incorrectas
         print("\n1. Limpiando asignaciones incorrectas...")
         incorrect_users = ['user_colmena', 'user_positiva', 'user_sura', 'manager_colmena', 'manager_positiva', 'manager_sura']
-        
-        for username in incorrect_users:
-            user = db.query(User).filter(User.username == username).first()
-            if user:
-                tasks_to_clear = db.query(Task).filter(Task.assigned_to == user.id).all()
-                for task in tasks_to_clear:
-                    task.assigned_to = None
-                print(f"  ✓ Limpiadas {len(tasks_to_clear)} tareas asignadas incorrectamente a {username}")
-        
+    
+        incorrect_user_ids = [
+            user_id for (user_id,) in db.query(User.id).filter(User.username.in_(incorrect_users))
+        ]
+        cleared = db.execute(
+            update(Task).where(Task.assigned_to.in_(incorrect_user_ids)).values(assigned_to=None)
+        ).rowcount
+        print(f"  ✓ Limpiadas {cleared} tareas asignadas incorrectamente")
+    
         db.commit()
         
         # Crear usuarios reales para los asesores si no existen
@@ -97,111 +98,29 @@ def fix_task_assignments():
         
         # Ahora reasignar las tareas correctamente
         print("\n3. Reasignando tareas basándose en los archivos Excel...")
-        
-        # Procesar archivo de Colmena
-        colmena_file = "Files/Estado de Tareas_COLMENA ARL.xlsx"
-        if os.path.exists(colmena_file):
-            df_colmena = pd.read_excel(colmena_file)
-            print(f"\n--- Procesando {len(df_colmena)} actividades de COLMENA ARL ---")
-            
-            assigned_count = 0
-            for index, row in df_colmena.iterrows():
-                try:
-                    empresa = row.get('EMPRESA')
-                    actividad = row.get('ACTIVIDAD')
-                    asesor_asignado = row.get('ASESOR ASIGNADO')
-                    
-                    if pd.isna(empresa) or pd.isna(actividad) or pd.isna(asesor_asignado):
-                        continue
-                    
-                    # Buscar el cliente
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == colmena_arl.id
-                    ).first()
-                    
-                    if not client:
-                        continue
-                    
-                    # Buscar la tarea
-                    task = db.query(Task).filter(
-                        Task.title.like(f"%{actividad[:50]}%"),
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if not task:
-                        continue
-                    
-                    # Buscar el usuario asesor
-                    username = str(asesor_asignado).lower().replace(' ', '_').replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-                    user = db.query(User).filter(User.username == username).first()
-                    
-                    if user:
-                        task.assigned_to = user.id
-                        assigned_count += 1
-                        if assigned_count <= 10:  # Mostrar solo las primeras 10
-                            print(f"  ✓ {actividad[:40]}... → {user.full_name}")
-                    else:
-                        print(f"  ⚠ Usuario no encontrado: {asesor_asignado} ({username})")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
-            print(f"  ✓ Total asignadas en Colmena: {assigned_count}")
-        
-        # Procesar archivo de Positiva
-        positiva_file = "Files/Estado de Tareas_POSITIVA ARL.xlsx"
-        if os.path.exists(positiva_file):
-            df_positiva = pd.read_excel(positiva_file)
-            print(f"\n--- Procesando {len(df_positiva)} actividades de POSITIVA ARL ---")
-            
-            assigned_count = 0
-            for index, row in df_positiva.iterrows():
-                try:
-                    empresa = row.get('EMPRESA')
-                    actividad = row.get('ACTIVIDAD')
-                    asesor = row.get('ASESOR')
-                    
-                    if pd.isna(empresa) or pd.isna(actividad) or pd.isna(asesor):
-                        continue
-                    
-                    # Buscar el cliente
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == positiva_arl.id
-                    ).first()
-                    
-                    if not client:
-                        continue
-                    
-                    # Buscar la tarea
-                    task = db.query(Task).filter(
-                        Task.title.like(f"%{actividad[:50]}%"),
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if not task:
-                        continue
-                    
-                    # Buscar el usuario asesor
-                    username = f"{str(asesor).lower().replace(' ', '_').replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')}_positiva"
-                    user = db.query(User).filter(User.username == username).first()
-                    
-                    if user:
-                        task.assigned_to = user.id
-                        assigned_count += 1
-                        if assigned_count <= 10:  # Mostrar solo las primeras 10
-                            print(f"  ✓ {actividad[:40]}... → {user.full_name}")
-                    else:
-                        print(f"  ⚠ Usuario no encontrado: {asesor} ({username})")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
-            print(f"  ✓ Total asignadas en Positiva: {assigned_count}")
-        
+    
+        for sheet in ASSIGNMENT_SHEETS:
+            if not os.path.exists(sheet["file"]):
+                continue
+            arl = colmena_arl if sheet["arl"] == "COLMENA ARL" else positiva_arl
+            df = pd.read_excel(sheet["file"])
+            print(f"\n--- Procesando {len(df)} actividades de {sheet['arl']} ---")
+    
+            # Cliente, tarea y usuario de todas las filas con un par de consultas
+            rows = resolve_sheet_assignments(db, df, arl.id, sheet["advisor"], sheet["suffix"])
+            rows = rows[rows["task_id"].notna()]
+            found = rows[rows["user_id"].notna()]
+            for row in found.head(10).itertuples():  # Mostrar solo las primeras 10
+                print(f"  ✓ {row.actividad[:40]}... → {row.asesor}")
+            missing = rows[rows["user_id"].isna()].drop_duplicates("username")
+            for row in missing.itertuples():
+                print(f"  ⚠ Usuario no encontrado: {row.asesor} ({row.username})")
+    
+            assigned_count = assign_tasks(db, found["task_id"], found["user_id"])
+            print(f"  ✓ Total asignadas en {sheet['arl']}: {assigned_count}")
+    
+        # Actualizar las estadísticas precalculadas del dashboard (dependen del usuario asignado)
+        rebuild_task_stats_rollup(db)
         db.commit()
         
         # Mostrar resumen final
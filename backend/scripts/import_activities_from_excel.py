@@ -8,75 +8,124 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
+import time
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import Base, ARL, Client, User, Task, TaskStatus, TaskPriority, UserRole
-from app.auth import get_password_hash
-from datetime import datetime, timedelta
-import re
+from app.stats import rebuild_task_stats_rollup
+from app.excel_import import (
+    column, as_text, to_records, clean_dates, map_task_status, map_task_priority,
+    join_labeled, custom_fields_records, load_client_ids, load_task_keys, insert_tasks
+)
 
-def parse_date(date_str):
-    """Parsear fecha desde string"""
-    if pd.isna(date_str) or date_str == '':
-        return None
+# Columnas de cada hoja: fecha de vencimiento, estado (None: todas pendientes),
+# partes de la descripción (etiqueta, columna) y campos personalizados (campo, columna)
+ARL_SHEETS = [
+    {
+        "arl": "COLMENA ARL",
+        "file": "Files/Estado de Tareas_COLMENA ARL.xlsx",
+        "due_date": "FECHA FINAL",
+        "status": None,
+        "description": [
+            ("Detalle", "DETALLE ACTIVIDAD"),
+            ("Entregables", "Entregables"),
+            ("Tipo", "Tipo de Actividad"),
+            ("Ciudad", "CIUDAD DE DESARROLLO"),
+            ("Observaciones", "OBSERVACIONES"),
+        ],
+        "custom_fields": {
+            "nit": "NIT",
+            "linea": "LINEA",
+            "programa": "PROGRAMA",
+            "componente": "COMPONENTE",
+            "numero_os": "Nro. OS",
+            "asesor_asignado": "ASESOR ASIGNADO",
+            "horas_pendientes": "HORAS PENDIENTES POR EJECUTAR",
+        },
+    },
+    {
+        "arl": "POSITIVA ARL",
+        "file": "Files/Estado de Tareas_POSITIVA ARL.xlsx",
+        "due_date": "FECHA MÁXIMA DE EJECUCIÓN",
+        "status": "ESTADO",
+        "description": [
+            ("Código", "CODIGO"),
+            ("No. Autorización", "No. Aut"),
+            ("ID Actividad", "Id Actividad"),
+            ("Mes", "MES"),
+            ("EIS", "EIS"),
+            ("Asesor", "ASESOR"),
+            ("Observaciones", "OBSERVACIONES"),
+        ],
+        "custom_fields": {
+            "nit": "NIT",
+            "codigo": "CODIGO",
+            "numero_autorizacion": "No. Aut",
+            "id_actividad": "Id Actividad",
+            "asesor": "ASESOR",
+            "pendientes_app": "PENDIENTES POR REGISTRAR DESDE APP",
+        },
+    },
+]
+
+def build_task_records(df, sheet, client_ids, admin_user_id):
+    """Normaliza la hoja completa con operaciones vectorizadas y retorna las filas a insertar"""
+    df = df[df["EMPRESA"].notna() & df["ACTIVIDAD"].notna()]
     
-    try:
-        # Intentar diferentes formatos de fecha
-        if isinstance(date_str, str):
-            # Formato DD/MM/YYYY
-            if '/' in date_str:
-                return datetime.strptime(date_str, '%d/%m/%Y')
-            # Formato YYYY-MM-DD
-            elif '-' in date_str:
-                return datetime.strptime(date_str, '%Y-%m-%d')
-        elif isinstance(date_str, datetime):
-            return date_str
-        elif hasattr(date_str, 'date'):
-            return date_str.date()
-    except:
-        pass
+    client_id = df["EMPRESA"].map(client_ids)
+    for empresa in df.loc[client_id.isna(), "EMPRESA"].unique():
+        print(f"  ⚠ Cliente no encontrado: {empresa}")
+    df = df[client_id.notna()]
+    client_id = client_id[client_id.notna()].astype(int)
+    
+    status = (
+        map_task_status(df[sheet["status"]]) if sheet["status"]
+        else pd.Series(TaskStatus.PENDIENTE, index=df.index)
+    )
+    custom_fields = {}
+    for name, source in sheet["custom_fields"].items():
+        custom_fields[name] = as_text(column(df, source))
     
-    return None
+    tasks = pd.DataFrame({
+        # Truncar título si es muy largo
+        "title": df["ACTIVIDAD"].astype(str).str.slice(0, 200),
+        "description": join_labeled(df, sheet["description"], "Actividad importada desde Excel"),
+        "status": status,
+        "priority": map_task_priority(column(df, "HORAS ASIGNADAS")),
+        "due_date": clean_dates(column(df, sheet["due_date"])),
+        "client_id": client_id,
+        "created_by": admin_user_id,
+    })
+    tasks["custom_fields"] = custom_fields_records(custom_fields)
+    return tasks
 
-def determine_task_status(estado_str, fecha_final):
-    """Determinar el estado de la tarea basado en el estado y fecha"""
-    if pd.isna(estado_str):
-        estado_str = ""
+def import_sheet(db, sheet, admin_user_id):
+    """Importa las actividades de una hoja; omite las que ya existen (mismo título y cliente)"""
+    arl = db.query(ARL).filter(ARL.name == sheet["arl"]).first()
+    print(f"\n=== IMPORTANDO ACTIVIDADES DE {sheet['arl']} ===")
+    if not os.path.exists(sheet["file"]):
+        print(f"❌ Archivo no encontrado: {sheet['file']}")
+        return 0
     
-    estado_str = str(estado_str).lower()
+    start = time.perf_counter()
+    df = pd.read_excel(sheet["file"])
+    print(f"Procesando {len(df)} actividades de {sheet['arl']}...")
     
-    if 'completada' in estado_str or 'finalizada' in estado_str or 'terminada' in estado_str:
-        return TaskStatus.COMPLETADA
-    elif 'en progreso' in estado_str or 'en proceso' in estado_str or 'ejecutando' in estado_str:
-        return TaskStatus.EN_PROGRESO
-    elif 'cancelada' in estado_str or 'anulada' in estado_str:
-        return TaskStatus.CANCELADA
-    else:
-        # Si no hay estado específico, determinar por fecha
-        if fecha_final:
-            if fecha_final < datetime.now():
-                return TaskStatus.PENDIENTE  # Vencida pero pendiente
-            else:
-                return TaskStatus.PENDIENTE
-        return TaskStatus.PENDIENTE
-
-def determine_task_priority(horas_asignadas, observaciones):
-    """Determinar la prioridad de la tarea"""
-    if pd.isna(horas_asignadas):
-        horas_asignadas = 0
+    client_ids = load_client_ids(db, arl.id)
+    tasks = build_task_records(df, sheet, client_ids, admin_user_id)
     
-    try:
-        horas = float(horas_asignadas)
-        if horas >= 100:
-            return TaskPriority.CRITICA
-        elif horas >= 50:
-            return TaskPriority.ALTA
-        elif horas >= 20:
-            return TaskPriority.MEDIA
-        else:
-            return TaskPriority.BAJA
-    except:
-        return TaskPriority.MEDIA
+    # Omitir tareas repetidas en la hoja o que ya existen en la base de datos
+    tasks = tasks.drop_duplicates(["client_id", "title"])
+    existing = load_task_keys(db, tasks["client_id"].unique())
+    tasks = tasks.merge(
+        existing[["client_id", "title"]].assign(exists=True), on=["client_id", "title"], how="left"
+    )
+    tasks = tasks[tasks["exists"].isna()].drop(columns="exists")
+    
+    imported = insert_tasks(db, to_records(tasks))
+    db.commit()
+    print(f"✓ Importadas {imported} actividades de {sheet['arl']} en {time.perf_counter() - start:.1f} s")
+    return imported
 
 def import_activities_from_excel():
     """Importar actividades desde archivos Excel"""
@@ -99,213 +148,13 @@ def import_activities_from_excel():
             return
         
         print(f"Usuario admin encontrado: {admin_user.username}")
-        
-        # Importar actividades de COLMENA ARL
-        print("\n=== IMPORTANDO ACTIVIDADES DE COLMENA ARL ===")
-        colmena_file = "Files/Estado de Tareas_COLMENA ARL.xlsx"
-        if os.path.exists(colmena_file):
-            df_colmena = pd.read_excel(colmena_file)
-            
-            print(f"Procesando {len(df_colmena)} actividades de COLMENA ARL...")
-            
-            for index, row in df_colmena.iterrows():
-                try:
-                    # Obtener cliente
-                    empresa = row['EMPRESA']
-                    if pd.isna(empresa):
-                        continue
-                        
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == colmena_arl.id
-                    ).first()
-                    
-                    if not client:
-                        print(f"  ⚠ Cliente no encontrado: {empresa}")
-                        continue
-                    
-                    # Verificar si la tarea ya existe
-                    actividad = row['ACTIVIDAD']
-                    if pd.isna(actividad):
-                        continue
-                    
-                    existing_task = db.query(Task).filter(
-                        Task.title == actividad,
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if existing_task:
-                        continue  # Ya existe
-                    
-                    # Crear tarea
-                    fecha_final = parse_date(row.get('FECHA FINAL'))
-                    horas_asignadas = row.get('HORAS ASIGNADAS', 0)
-                    observaciones = row.get('OBSERVACIONES', '')
-                    
-                    # Crear descripción detallada
-                    descripcion_parts = []
-                    if not pd.isna(row.get('DETALLE ACTIVIDAD')):
-                        descripcion_parts.append(f"Detalle: {row['DETALLE ACTIVIDAD']}")
-                    if not pd.isna(row.get('Entregables')):
-                        descripcion_parts.append(f"Entregables: {row['Entregables']}")
-                    if not pd.isna(row.get('Tipo de Actividad')):
-                        descripcion_parts.append(f"Tipo: {row['Tipo de Actividad']}")
-                    if not pd.isna(row.get('CIUDAD DE DESARROLLO')):
-                        descripcion_parts.append(f"Ciudad: {row['CIUDAD DE DESARROLLO']}")
-                    if not pd.isna(observaciones):
-                        descripcion_parts.append(f"Observaciones: {observaciones}")
-                    
-                    descripcion = "\n".join(descripcion_parts) if descripcion_parts else "Actividad importada desde Excel"
-                    
-                    # Campos personalizados
-                    custom_fields = {}
-                    if not pd.isna(row.get('NIT')):
-                        custom_fields['nit'] = str(row['NIT'])
-                    if not pd.isna(row.get('LINEA')):
-                        custom_fields['linea'] = str(row['LINEA'])
-                    if not pd.isna(row.get('PROGRAMA')):
-                        custom_fields['programa'] = str(row['PROGRAMA'])
-                    if not pd.isna(row.get('COMPONENTE')):
-                        custom_fields['componente'] = str(row['COMPONENTE'])
-                    if not pd.isna(row.get('Nro. OS')):
-                        custom_fields['numero_os'] = str(row['Nro. OS'])
-                    if not pd.isna(row.get('ASESOR ASIGNADO')):
-                        custom_fields['asesor_asignado'] = str(row['ASESOR ASIGNADO'])
-                    if not pd.isna(row.get('HORAS PENDIENTES POR EJECUTAR')):
-                        custom_fields['horas_pendientes'] = str(row['HORAS PENDIENTES POR EJECUTAR'])
-                    
-                    # Truncar título si es muy largo
-                    title = actividad[:200] if len(actividad) > 200 else actividad
-                    
-                    task = Task(
-                        title=title,
-                        description=descripcion,
-                        status=TaskStatus.PENDIENTE,
-                        priority=determine_task_priority(horas_asignadas, observaciones),
-                        due_date=fecha_final,
-                        client_id=client.id,
-                        created_by=admin_user.id,
-                        custom_fields=custom_fields
-                    )
-                    
-                    db.add(task)
-                    
-                    if (index + 1) % 10 == 0:
-                        print(f"  Procesadas {index + 1}/{len(df_colmena)} actividades...")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
-            db.commit()
-            print(f"✓ Importadas actividades de COLMENA ARL")
-        else:
-            print(f"❌ Archivo no encontrado: {colmena_file}")
-        
-        # Importar actividades de POSITIVA ARL
-        print("\n=== IMPORTANDO ACTIVIDADES DE POSITIVA ARL ===")
-        positiva_file = "Files/Estado de Tareas_POSITIVA ARL.xlsx"
-        if os.path.exists(positiva_file):
-            df_positiva = pd.read_excel(positiva_file)
-            
-            print(f"Procesando {len(df_positiva)} actividades de POSITIVA ARL...")
-            
-            for index, row in df_positiva.iterrows():
-                try:
-                    # Obtener cliente
-                    empresa = row['EMPRESA']
-                    if pd.isna(empresa):
-                        continue
-                        
-                    client = db.query(Client).filter(
-                        Client.name == empresa,
-                        Client.arl_id == positiva_arl.id
-                    ).first()
-                    
-                    if not client:
-                        print(f"  ⚠ Cliente no encontrado: {empresa}")
-                        continue
-                    
-                    # Verificar si la tarea ya existe
-                    actividad = row['ACTIVIDAD']
-                    if pd.isna(actividad):
-                        continue
-                    
-                    existing_task = db.query(Task).filter(
-                        Task.title == actividad,
-                        Task.client_id == client.id
-                    ).first()
-                    
-                    if existing_task:
-                        continue  # Ya existe
-                    
-                    # Crear tarea
-                    fecha_maxima = parse_date(row.get('FECHA MÁXIMA DE EJECUCIÓN'))
-                    horas_asignadas = row.get('HORAS ASIGNADAS', 0)
-                    observaciones = row.get('OBSERVACIONES', '')
-                    estado = row.get('ESTADO', '')
-                    
-                    # Crear descripción detallada
-                    descripcion_parts = []
-                    if not pd.isna(row.get('CODIGO')):
-                        descripcion_parts.append(f"Código: {row['CODIGO']}")
-                    if not pd.isna(row.get('No. Aut')):
-                        descripcion_parts.append(f"No. Autorización: {row['No. Aut']}")
-                    if not pd.isna(row.get('Id Actividad')):
-                        descripcion_parts.append(f"ID Actividad: {row['Id Actividad']}")
-                    if not pd.isna(row.get('MES')):
-                        descripcion_parts.append(f"Mes: {row['MES']}")
-                    if not pd.isna(row.get('EIS')):
-                        descripcion_parts.append(f"EIS: {row['EIS']}")
-                    if not pd.isna(row.get('ASESOR')):
-                        descripcion_parts.append(f"Asesor: {row['ASESOR']}")
-                    if not pd.isna(observaciones):
-                        descripcion_parts.append(f"Observaciones: {observaciones}")
-                    
-                    descripcion = "\n".join(descripcion_parts) if descripcion_parts else "Actividad importada desde Excel"
-                    
-                    # Campos personalizados
-                    custom_fields = {}
-                    if not pd.isna(row.get('NIT')):
-                        custom_fields['nit'] = str(row['NIT'])
-                    if not pd.isna(row.get('CODIGO')):
-                        custom_fields['codigo'] = str(row['CODIGO'])
-                    if not pd.isna(row.get('No. Aut')):
-                        custom_fields['numero_autorizacion'] = str(row['No. Aut'])
-                    if not pd.isna(row.get('Id Actividad')):
-                        custom_fields['id_actividad'] = str(row['Id Actividad'])
-                    if not pd.isna(row.get('ASESOR')):
-                        custom_fields['asesor'] = str(row['ASESOR'])
-                    if not pd.isna(row.get('PENDIENTES POR REGISTRAR DESDE APP')):
-                        custom_fields['pendientes_app'] = str(row['PENDIENTES POR REGISTRAR DESDE APP'])
-                    
-                    # Truncar título si es muy largo
-                    title = actividad[:200] if len(actividad) > 200 else actividad
-                    
-                    task = Task(
-                        title=title,
-                        description=descripcion,
-                        status=determine_task_status(estado, fecha_maxima),
-                        priority=determine_task_priority(horas_asignadas, observaciones),
-                        due_date=fecha_maxima,
-                        client_id=client.id,
-                        created_by=admin_user.id,
-                        custom_fields=custom_fields
-                    )
-                    
-                    db.add(task)
-                    
-                    if (index + 1) % 100 == 0:
-                        print(f"  Procesadas {index + 1}/{len(df_positiva)} actividades...")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error procesando fila {index}: {e}")
-                    continue
-            
-            db.commit()
-            print(f"✓ Importadas actividades de POSITIVA ARL")
-        else:
-            print(f"❌ Archivo no encontrado: {positiva_file}")
+    
+        for sheet in ARL_SHEETS:
+            import_sheet(db, sheet, admin_user.id)
+    
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(db)
+        db.commit()
         
         # Mostrar resumen final
         print("\n=== RESUMEN FINAL ===")
@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 from app.models import User, Client, Task, ARL
+from app.stats import rebuild_task_stats_rollup
 
 def import_data_direct():
     """Importar datos directamente"""
@@ -123,6 +124,8 @@ def import_data_direct():
                 custom_fields=task_data['custom_fields']
             )
             db.add(task)
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(db)
         db.commit()
         print(f"✅ {len(tasks_data)} Tareas importadas")
         
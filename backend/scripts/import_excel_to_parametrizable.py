@@ -12,40 +12,23 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import Base, Client, User, Task, TaskStatus, TaskPriority, UserRole
 from app.auth import get_password_hash
-from datetime import datetime
-import numpy as np
+from app.stats import rebuild_task_stats_rollup
+from app.excel_import import (
+    column, to_records, clean_strings, clean_dates, clean_integers, custom_fields_records, insert_tasks
+)
 
-def clean_string(value, max_length=200):
-    """Limpiar y truncar strings"""
-    if pd.isna(value) or value is None:
-        return None
-    value = str(value).strip()
-    if value == 'nan' or value == 'NaT':
-        return None
-    if len(value) > max_length:
-        value = value[:max_length-3] + "..."
-    return value
+def valid_activity_rows(df):
+    """Filas con ACTIVIDAD no vacía"""
+    actividad = clean_strings(column(df, 'ACTIVIDAD'))
+    return df[actividad.notna() & (actividad != '')]
 
-def clean_date(value):
-    """Limpiar fechas"""
-    if pd.isna(value) or value is None:
-        return None
-    if str(value) == 'nan' or str(value) == 'NaT':
-        return None
-    try:
-        if isinstance(value, str):
-            # Intentar parsear fechas en formato DD/MM/YYYY
-            if '/' in value:
-                parts = value.split('/')
-                if len(parts) == 3:
-                    day, month, year = parts
-                    # Corregir años de 2 dígitos
-                    if len(year) == 2:
-                        year = '20' + year if int(year) < 50 else '19' + year
-                    return datetime.strptime(f"{day}/{month}/{year}", "%d/%m/%Y")
-        return pd.to_datetime(value)
-    except:
-        return None
+def add_date_fields(custom_fields, dates_by_field):
+    """Agrega a los campos personalizados de cada fila las fechas presentes en formato ISO"""
+    for name, dates in dates_by_field.items():
+        iso_dates = dates.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        for fields, value in zip(custom_fields, iso_dates):
+            if isinstance(value, str):
+                fields[name] = value
 
 def create_colmena_client():
     """Crear cliente Colmena ARL con configuración específica"""
@@ -374,58 +357,45 @@ def import_colmena_data(file_path, client_id, admin_user_id):
     
     try:
         print(f"📊 Importando datos de Colmena ARL...")
-        df = pd.read_excel(file_path)
-        
-        tasks_created = 0
-        
-        for index, row in df.iterrows():
-            # Saltar filas vacías o con datos inválidos
-            if pd.isna(row.get('ACTIVIDAD')) or str(row.get('ACTIVIDAD')).strip() in ['nan', 'NaT', '']:
-                continue
-                
-            # Mapear datos de Colmena
-            task_data = {
-                'title': clean_string(row.get('ACTIVIDAD'), 200),
-                'description': clean_string(row.get('DETALLE ACTIVIDAD'), 1000),
-                'status': TaskStatus.PENDIENTE,
-                'priority': TaskPriority.MEDIA,
-                'client_id': client_id,
-                'created_by': admin_user_id,
-                'custom_fields': {
-                    'nit': clean_string(row.get('NIT'), 20),
-                    'linea': clean_string(row.get('LINEA'), 100),
-                    'programa': clean_string(row.get('PROGRAMA'), 100),
-                    'componente': clean_string(row.get('COMPONENTE'), 100),
-                    'actividad': clean_string(row.get('ACTIVIDAD'), 200),
-                    'ciudad_desarrollo': clean_string(row.get('CIUDAD DE DESARROLLO'), 100),
-                    'detalle_actividad': clean_string(row.get('DETALLE ACTIVIDAD'), 2000),
-                    'entregables': clean_string(row.get('Entregables'), 1000),
-                    'tipo_actividad': clean_string(row.get('Tipo de Actividad'), 50),
-                    'nro_os': clean_string(row.get('Nro. OS'), 50),
-                    'horas_asignadas': int(row.get('HORAS ASIGNADAS', 0)) if pd.notna(row.get('HORAS ASIGNADAS')) else None,
-                    'horas_pendientes': int(row.get('HORAS PENDIENTES POR EJECUTAR', 0)) if pd.notna(row.get('HORAS PENDIENTES POR EJECUTAR')) else None,
-                    'dis_responsable': clean_string(row.get('DIS y/o RESPONSABLE ARL'), 100),
-                    'asesor_asignado': clean_string(row.get('ASESOR ASIGNADO'), 100),
-                    'observaciones': clean_string(row.get('OBSERVACIONES'), 1000),
-                }
-            }
-            
-            # Agregar fecha final si existe
-            fecha_final = clean_date(row.get('FECHA FINAL'))
-            if fecha_final:
-                task_data['due_date'] = fecha_final
-                task_data['custom_fields']['fecha_final'] = fecha_final.isoformat()
-            
-            # Agregar fecha de asignación si existe
-            fecha_asignacion = clean_date(row.get('FECHA DE ASIGNACIÓN'))
-            if fecha_asignacion:
-                task_data['custom_fields']['fecha_asignacion'] = fecha_asignacion.isoformat()
-            
-            # Crear tarea
-            task = Task(**task_data)
-            db.add(task)
-            tasks_created += 1
-        
+        # Saltar filas vacías o con datos inválidos
+        df = valid_activity_rows(pd.read_excel(file_path))
+    
+        # Mapear datos de Colmena (columnas completas, sin recorrer fila por fila)
+        fecha_final = clean_dates(column(df, 'FECHA FINAL'))
+        custom_fields = custom_fields_records({
+            'nit': clean_strings(column(df, 'NIT'), 20),
+            'linea': clean_strings(column(df, 'LINEA'), 100),
+            'programa': clean_strings(column(df, 'PROGRAMA'), 100),
+            'componente': clean_strings(column(df, 'COMPONENTE'), 100),
+            'actividad': clean_strings(column(df, 'ACTIVIDAD'), 200),
+            'ciudad_desarrollo': clean_strings(column(df, 'CIUDAD DE DESARROLLO'), 100),
+            'detalle_actividad': clean_strings(column(df, 'DETALLE ACTIVIDAD'), 2000),
+            'entregables': clean_strings(column(df, 'Entregables'), 1000),
+            'tipo_actividad': clean_strings(column(df, 'Tipo de Actividad'), 50),
+            'nro_os': clean_strings(column(df, 'Nro. OS'), 50),
+            'horas_asignadas': clean_integers(column(df, 'HORAS ASIGNADAS')),
+            'horas_pendientes': clean_integers(column(df, 'HORAS PENDIENTES POR EJECUTAR')),
+            'dis_responsable': clean_strings(column(df, 'DIS y/o RESPONSABLE ARL'), 100),
+            'asesor_asignado': clean_strings(column(df, 'ASESOR ASIGNADO'), 100),
+            'observaciones': clean_strings(column(df, 'OBSERVACIONES'), 1000),
+        }, drop_empty=False)
+        add_date_fields(custom_fields, {
+            'fecha_final': fecha_final,
+            'fecha_asignacion': clean_dates(column(df, 'FECHA DE ASIGNACIÓN')),
+        })
+    
+        tasks = pd.DataFrame({
+            'title': clean_strings(df['ACTIVIDAD'], 200),
+            'description': clean_strings(column(df, 'DETALLE ACTIVIDAD'), 1000),
+            'status': TaskStatus.PENDIENTE,
+            'priority': TaskPriority.MEDIA,
+            'due_date': fecha_final,
+            'client_id': client_id,
+            'created_by': admin_user_id,
+        }, index=df.index)
+        tasks['custom_fields'] = custom_fields
+        tasks_created = insert_tasks(db, to_records(tasks))
+    
         db.commit()
         print(f"✅ Importadas {tasks_created} tareas de Colmena ARL")
         return tasks_created
@@ -443,58 +413,46 @@ def import_positiva_data(file_path, client_id, admin_user_id):
     
     try:
         print(f"📊 Importando datos de Positiva ARL...")
-        df = pd.read_excel(file_path)
-        
-        tasks_created = 0
-        
-        for index, row in df.iterrows():
-            # Saltar filas vacías o con datos inválidos
-            if pd.isna(row.get('ACTIVIDAD')) or str(row.get('ACTIVIDAD')).strip() in ['nan', 'NaT', '']:
-                continue
-                
-            # Mapear datos de Positiva
-            task_data = {
-                'title': clean_string(row.get('ACTIVIDAD'), 200),
-                'description': f"Empresa: {clean_string(row.get('EMPRESA'), 100)} - Código: {clean_string(row.get('CODIGO'), 50)}",
-                'status': TaskStatus.PENDIENTE,
-                'priority': TaskPriority.MEDIA,
-                'client_id': client_id,
-                'created_by': admin_user_id,
-                'custom_fields': {
-                    'nit': clean_string(row.get('NIT'), 20),
-                    'codigo': clean_string(row.get('CODIGO'), 50),
-                    'actividad': clean_string(row.get('ACTIVIDAD'), 200),
-                    'no_aut': clean_string(row.get('No. Aut'), 50),
-                    'id_actividad': clean_string(row.get('Id Actividad'), 50),
-                    'mes': clean_string(row.get('MES'), 20),
-                    'horas_asignadas': int(row.get('HORAS ASIGNADAS', 0)) if pd.notna(row.get('HORAS ASIGNADAS')) else None,
-                    'pendientes_registrar_app': int(row.get('PENDIENTES POR REGISTRAR DESDE APP', 0)) if pd.notna(row.get('PENDIENTES POR REGISTRAR DESDE APP')) else None,
-                    'eis': clean_string(row.get('EIS'), 100),
-                    'asesor': clean_string(row.get('ASESOR'), 100),
-                    'estado_detallado': clean_string(row.get('ESTADO'), 50),
-                    'observaciones': clean_string(row.get('OBSERVACIONES'), 1000),
-                }
-            }
-            
-            # Agregar fechas si existen
-            fecha_autorizacion = clean_date(row.get('FECHA DE AUTORIZACIÓN'))
-            if fecha_autorizacion:
-                task_data['custom_fields']['fecha_autorizacion'] = fecha_autorizacion.isoformat()
-            
-            fecha_maxima = clean_date(row.get('FECHA MÁXIMA DE EJECUCIÓN'))
-            if fecha_maxima:
-                task_data['custom_fields']['fecha_maxima_ejecucion'] = fecha_maxima.isoformat()
-                task_data['due_date'] = fecha_maxima
-            
-            fecha_asignacion = clean_date(row.get('FECHA DE ASIGNACIÓN'))
-            if fecha_asignacion:
-                task_data['custom_fields']['fecha_asignacion'] = fecha_asignacion.isoformat()
-            
-            # Crear tarea
-            task = Task(**task_data)
-            db.add(task)
-            tasks_created += 1
-        
+        # Saltar filas vacías o con datos inválidos
+        df = valid_activity_rows(pd.read_excel(file_path))
+    
+        # Mapear datos de Positiva (columnas completas, sin recorrer fila por fila)
+        fecha_maxima = clean_dates(column(df, 'FECHA MÁXIMA DE EJECUCIÓN'))
+        custom_fields = custom_fields_records({
+            'nit': clean_strings(column(df, 'NIT'), 20),
+            'codigo': clean_strings(column(df, 'CODIGO'), 50),
+            'actividad': clean_strings(column(df, 'ACTIVIDAD'), 200),
+            'no_aut': clean_strings(column(df, 'No. Aut'), 50),
+            'id_actividad': clean_strings(column(df, 'Id Actividad'), 50),
+            'mes': clean_strings(column(df, 'MES'), 20),
+            'horas_asignadas': clean_integers(column(df, 'HORAS ASIGNADAS')),
+            'pendientes_registrar_app': clean_integers(column(df, 'PENDIENTES POR REGISTRAR DESDE APP')),
+            'eis': clean_strings(column(df, 'EIS'), 100),
+            'asesor': clean_strings(column(df, 'ASESOR'), 100),
+            'estado_detallado': clean_strings(column(df, 'ESTADO'), 50),
+            'observaciones': clean_strings(column(df, 'OBSERVACIONES'), 1000),
+        }, drop_empty=False)
+        add_date_fields(custom_fields, {
+            'fecha_autorizacion': clean_dates(column(df, 'FECHA DE AUTORIZACIÓN')),
+            'fecha_maxima_ejecucion': fecha_maxima,
+            'fecha_asignacion': clean_dates(column(df, 'FECHA DE ASIGNACIÓN')),
+        })
+    
+        tasks = pd.DataFrame({
+            'title': clean_strings(df['ACTIVIDAD'], 200),
+            'description': (
+                "Empresa: " + clean_strings(column(df, 'EMPRESA'), 100).astype(str)
+                + " - Código: " + clean_strings(column(df, 'CODIGO'), 50).astype(str)
+            ),
+            'status': TaskStatus.PENDIENTE,
+            'priority': TaskPriority.MEDIA,
+            'due_date': fecha_maxima,
+            'client_id': client_id,
+            'created_by': admin_user_id,
+        }, index=df.index)
+        tasks['custom_fields'] = custom_fields
+        tasks_created = insert_tasks(db, to_records(tasks))
+    
         db.commit()
         print(f"✅ Importadas {tasks_created} tareas de Positiva ARL")
         return tasks_created
@@ -547,6 +505,14 @@ def main():
         print(f"⚠️ Archivo de Positiva no encontrado: {positiva_file}")
         positiva_tasks = 0
     
+    # Actualizar las estadísticas precalculadas del dashboard
+    db = SessionLocal()
+    try:
+        rebuild_task_stats_rollup(db)
+        db.commit()
+    finally:
+        db.close()
+    
     print(f"\n🎉 Importación completada!")
     print(f"📊 Resumen:")
     print(f"   - Tareas de Colmena ARL: {colmena_tasks}")
@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models import Base, User, Company, Task
 from app.database import get_db
+from app.stats import rebuild_task_stats_rollup
 
 def get_local_db_connection():
     """Conectar a la base de datos local"""
@@ -170,6 +171,8 @@ def import_tasks(local_conn, railway_engine):
                 session.add(task)
                 imported_count += 1
         
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(session)
         session.commit()
         session.close()
         print(f"✅ {imported_count} tareas importadas")
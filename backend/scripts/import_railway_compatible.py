@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, engine
 from app.models import User, Client, Task, ARL
+from app.stats import rebuild_task_stats_rollup
 from sqlalchemy import text, inspect
 
 def import_railway_compatible():
@@ -148,6 +149,8 @@ def import_railway_compatible():
                     else:
                         print(f"   ℹ️ Tarea ya existe: {task_data['title']}")
             
+            # Actualizar las estadísticas precalculadas del dashboard
+            rebuild_task_stats_rollup(db)
             db.commit()
             print("✅ Tareas creadas")
             
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script para importar una instantánea generada por export_snapshot.py, cargando los bloques
+de cada tabla (rangos de ids) en un pool de procesos con conexiones separadas. Se ejecuta
+sobre una base vacía (o con solo el admin inicial); si se interrumpe, volver a ejecutarlo
+completa la carga
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.snapshot import SNAPSHOT_WORKERS, check_snapshot_load, load_snapshot, read_manifest
+
+def import_snapshot(directory, workers=SNAPSHOT_WORKERS):
+    """Importar la instantánea del directorio indicado y verificar la integridad de la carga"""
+    print(f"📥 Importando instantánea desde: {directory}")
+    start = time.perf_counter()
+    
+    def print_progress(table, rows, total):
+        percent = rows / total * 100 if total else 100
+        print(f"   ✅ {table}: {rows}/{total} filas ({percent:.0f}%) - {time.perf_counter() - start:.1f} s")
+    
+    try:
+        manifest = read_manifest(directory)
+        loaded = load_snapshot(directory, workers=workers, progress=print_progress)
+        
+        print(f"📊 Datos importados en {time.perf_counter() - start:.1f} s:")
+        for table, rows in loaded.items():
+            print(f"   - {table}: {rows} de {manifest['tables'][table]['rows']}")
+    
+    except Exception as e:
+        print(f"❌ Error importando instantánea: {e}")
+        print("   Los bloques confirmados se conservan; vuelve a ejecutar el script para continuar")
+        raise
+    
+    # Verificar integridad: filas por rango de ids, referencias y rollup
+    print("🔍 Verificando integridad...")
+    db = SessionLocal()
+    try:
+        problems = check_snapshot_load(db, manifest)
+    finally:
+        db.close()
+    
+    if problems:
+        for problem in problems:
+            print(f"   ⚠️ {problem}")
+        print("❌ La base no coincide con la instantánea")
+        return False
+    
+    print("✅ Importación completada exitosamente")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importar una instantánea NDJSON por bloques")
+    parser.add_argument("directory", help="Directorio de la instantánea (con manifest.json)")
+    parser.add_argument("--workers", type=int, default=SNAPSHOT_WORKERS,
+                        help="Procesos que cargan bloques en paralelo (por defecto, uno por CPU)")
+    args = parser.parse_args()
+    
+    success = import_snapshot(args.directory, workers=args.workers)
+    sys.exit(0 if success else 1)
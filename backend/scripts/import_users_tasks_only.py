@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, engine
 from app.models import User, Client, Task, ARL
+from app.stats import rebuild_task_stats_rollup
 from sqlalchemy import text, inspect
 
 def import_users_tasks_only():
@@ -144,6 +145,8 @@ def import_users_tasks_only():
                 custom_fields=task_data['custom_fields']
             )
             db.add(task)
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(db)
         db.commit()
         print(f"✅ {len(data['tasks'])} Tareas importadas")
         
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import Base, ARL, Client, User, Task, TaskStatus, TaskPriority, UserRole
 from app.auth import get_password_hash
+from app.stats import rebuild_task_stats_rollup
 from datetime import datetime, timedelta
 
 def create_sample_data():
@@ -288,6 +289,8 @@ def create_sample_data():
         
         for task in tasks:
             db.add(task)
+        db.flush()
+        rebuild_task_stats_rollup(db)
         db.commit()
         
         print("✅ Datos de ejemplo creados exitosamente!")
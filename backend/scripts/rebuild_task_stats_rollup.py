@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir la tabla task_stats_rollup a partir de las tareas existentes
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import Base, TaskStatsRollup
+from app.stats import rebuild_task_stats_rollup
+
+def main():
+    """Función principal"""
+    print("🔄 Reconstruyendo estadísticas de tareas (task_stats_rollup)...")
+    
+    # Crear la tabla si aún no existe
+    Base.metadata.create_all(bind=engine, tables=[TaskStatsRollup.__table__])
+    
+    db = SessionLocal()
+    try:
+        rows = rebuild_task_stats_rollup(db)
+        db.commit()
+        print(f"✅ Rollup reconstruido: {rows} grupos (cliente, usuario, estado)")
+        return True
+    except Exception as e:
+        print(f"❌ Error reconstruyendo el rollup: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
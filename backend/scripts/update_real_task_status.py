@@ -11,6 +11,7 @@ import pandas as pd
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models import Task, User, Company
+from app.stats import rebuild_task_stats_rollup
 from app.schemas import TaskStatus
 import re
 
@@ -110,6 +111,9 @@ def update_real_task_status():
             
             print(f"   📊 Estados actualizados en POSITIVA ARL: {updated_count}")
         
+        # Actualizar las estadísticas precalculadas del dashboard
+        rebuild_task_stats_rollup(db)
+        
         # Confirmar cambios
         db.commit()
         
@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+
+# La configuración de app se lee al importarla: las variables se fijan antes.
+# Las pruebas usan una base SQLite temporal salvo que TEST_DATABASE_URL indique otra
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["OVERDUE_SCHEDULER_ENABLED"] = "false"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, async_engine, engine
+from app.models import ARL, Client, User, UserRole
+from app.auth import get_password_hash
+from app.main import app
+
+ADMIN_PASSWORD = "admin123"
+
+@pytest.fixture
+def db():
+    """Sesión sobre un esquema recién creado"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def admin(db):
+    """Usuario admin con su ARL y cliente"""
+    arl = ARL(name="COLMENA ARL")
+    db.add(arl)
+    db.flush()
+    client = Client(name="Cliente de prueba", arl_id=arl.id)
+    db.add(client)
+    db.flush()
+    user = User(
+        email="admin@example.com",
+        username="admin",
+        full_name="Administrador",
+        hashed_password=get_password_hash(ADMIN_PASSWORD),
+        role=UserRole.ADMIN,
+        client_id=client.id
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+@pytest.fixture
+def api():
+    """Cliente HTTP con un único event loop: las conexiones de asyncpg quedan ligadas al loop que las abrió"""
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(async_engine.dispose)
+
+@pytest.fixture
+def admin_headers(api, admin):
+    response = api.post("/api/v1/token", data={"username": "admin", "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
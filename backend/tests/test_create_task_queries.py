@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import async_engine
+
+@contextmanager
+def recorded_statements():
+    """Registra las sentencias que los endpoints asíncronos envían a la base de datos"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+def test_create_task_runs_one_select_and_one_insert(api, admin, admin_headers):
+    task = {"title": "Capacitación", "client_id": admin.client_id, "assigned_to": admin.id}
+    # La primera creación abre la conexión del engine asíncrono y crea la fila del rollup
+    assert api.post("/api/v1/tasks", json=task, headers=admin_headers).status_code == 200
+    
+    with recorded_statements() as statements:
+        response = api.post("/api/v1/tasks", json=task, headers=admin_headers)
+    
+    assert response.status_code == 200, response.text
+    assert response.json()["client"]["id"] == admin.client_id
+    assert response.json()["assigned_user"]["id"] == admin.id
+    
+    # Cliente y usuarios en un SELECT, la tarea con INSERT ... RETURNING y el contador del rollup
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "INSERT", "UPDATE"], statements
+    assert "FROM clients" in statements[0]
+    assert statements[1].startswith("INSERT INTO tasks") and "RETURNING" in statements[1]
+    assert statements[2].startswith("UPDATE task_stats_rollup")
@@ -0,0 +1,160 @@
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.auth import get_password_hash
+from app.database import AsyncSessionLocal, Base, async_engine, engine
+from app.main import app
+from app.models import Task
+from app.overdue import refresh_overdue_tasks
+from app.routers.tasks import encode_cursor
+
+# Verifica con EXPLAIN que las consultas que envían los endpoints usan los índices de tasks.
+# Requiere PostgreSQL: TEST_DATABASE_URL=postgresql://... pytest tests/test_task_indexes.py
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="EXPLAIN de índices de PostgreSQL (definir TEST_DATABASE_URL=postgresql://...)"
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "secret123"
+
+# Datos suficientes para que el planner distinga entre índices por su selectividad
+SEED_SQL = [
+    "INSERT INTO arls (id, name, is_active) VALUES (1, 'COLMENA ARL', true)",
+    "INSERT INTO clients (id, name, arl_id, is_active, custom_fields_config) "
+    "SELECT g, 'Cliente ' || g, 1, true, '[]' FROM generate_series(1, 20) g",
+    "INSERT INTO users (id, email, username, full_name, hashed_password, role, is_active, client_id, token_version) "
+    "SELECT g, 'user' || g || '@example.com', CASE g WHEN 1 THEN 'admin' WHEN 2 THEN 'asesor' ELSE 'user' || g END, "
+    "'Usuario ' || g, :password, CASE g WHEN 1 THEN 'ADMIN' ELSE 'USER' END::userrole, true, g % 20 + 1, 0 "
+    "FROM generate_series(1, 200) g",
+    "INSERT INTO tasks (id, title, description, status, priority, due_date, is_overdue, client_id, assigned_to, "
+    "created_by, custom_fields, created_at) "
+    "SELECT g, 'Actividad ' || g, 'Capacitación en seguridad', "
+    "(ARRAY['PENDIENTE', 'EN_PROGRESO', 'COMPLETADA', 'CANCELADA'])[g % 4 + 1]::taskstatus, 'MEDIA', "
+    "CASE WHEN g % 9 = 0 THEN NULL ELSE now() + ((g % 720) - 360) * interval '1 hour' END, false, "
+    "g % 20 + 1, CASE WHEN g % 10 = 0 THEN NULL ELSE g % 200 + 1 END, 1, "
+    "jsonb_build_object('programa', 'Programa ' || g % 50), now() - g * interval '1 minute' "
+    "FROM generate_series(1, 20000) g",
+    "UPDATE tasks SET is_overdue = true WHERE status IN ('PENDIENTE', 'EN_PROGRESO') AND due_date < now()",
+    "ANALYZE",
+]
+
+@pytest.fixture(scope="module")
+def api():
+    """Esquema como en el despliegue (create_all + migraciones) con datos; cliente HTTP de un único event loop"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    Base.metadata.create_all(bind=engine)
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+    with engine.begin() as conn:
+        for statement in SEED_SQL[:-1]:
+            conn.execute(text(statement), {"password": get_password_hash(PASSWORD)})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(SEED_SQL[-1]))
+    
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(async_engine.dispose)
+
+def login(api, username: str) -> dict:
+    response = api.post("/api/v1/token", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@contextmanager
+def captured_task_statement():
+    """Primera sentencia sobre tasks (con sus parámetros) que envía el engine asíncrono"""
+    captured = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not captured and re.search(r"\b(FROM|UPDATE) tasks\b", statement):
+            captured.append((statement, parameters))
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield captured
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+def explain(api, statement: str, parameters) -> str:
+    """Plan de la sentencia con los seq scans desactivados (comprueba que el índice es utilizable)"""
+    async def run():
+        async with async_engine.connect() as conn:
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            return "\n".join(row[0] for row in result)
+    return api.portal.call(run)
+
+def cursor_after(order_by: str, **values) -> str:
+    return encode_cursor(order_by, Task(id=10000, **values))
+
+NOW = datetime.now(timezone.utc)
+
+# (usuario, ruta, parámetros, índice esperado en el plan)
+ENDPOINT_CASES = {
+    "lista de un usuario por estado": (
+        "asesor", "/api/v1/tasks", {"status": "pendiente"}, "ix_tasks_client_id_status"
+    ),
+    "lista por asesor y estado": (
+        "admin", "/api/v1/tasks", {"assigned_to": "5", "status": "en_progreso"}, "ix_tasks_assigned_to_status"
+    ),
+    "lista de vencidas de un cliente": (
+        "admin", "/api/v1/tasks", {"client_id": "3", "overdue": "true"}, "ix_tasks_overdue"
+    ),
+    "lista por campo personalizado": (
+        "admin", "/api/v1/tasks", {"cf.programa": "Programa 7"}, "ix_tasks_custom_fields"
+    ),
+    "página por cursor (created_at)": (
+        "admin", "/api/v1/tasks/page", {"cursor": cursor_after("created_at", created_at=NOW)}, "ix_tasks_created_at_id"
+    ),
+    "página por cursor (due_date)": (
+        "admin", "/api/v1/tasks/page",
+        {"order_by": "due_date", "cursor": cursor_after("due_date", due_date=NOW)}, "ix_tasks_due_date_id"
+    ),
+    "página por cursor (due_date, tareas sin fecha)": (
+        "admin", "/api/v1/tasks/page",
+        {"order_by": "due_date", "cursor": cursor_after("due_date", due_date=None)}, "ix_tasks_due_date_id"
+    ),
+    "búsqueda": (
+        "admin", "/api/v1/tasks/search", {"q": "capacitacion"}, "ix_tasks_search_vector"
+    ),
+    "tareas por vencer de un asesor": (
+        "admin", "/api/v1/tasks/due", {"assigned_to": "5"}, "ix_tasks_assigned_to_open_due_date"
+    ),
+}
+
+@pytest.mark.parametrize("case", list(ENDPOINT_CASES))
+def test_endpoint_query_uses_index(api, case):
+    username, path, params, index_name = ENDPOINT_CASES[case]
+    headers = login(api, username)
+    with captured_task_statement() as captured:
+        response = api.get(path, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    assert captured, f"{path} no consultó tasks"
+    
+    plan = explain(api, *captured[0])
+    assert index_name in plan, plan
+
+def test_overdue_job_uses_partial_index(api):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await refresh_overdue_tasks(db)
+    
+    with captured_task_statement() as captured:
+        api.portal.call(run)
+    assert captured
+    
+    plan = explain(api, *captured[0])
+    assert "ix_tasks_pending_overdue" in plan, plan
@@ -17,19 +17,25 @@ function Tasks() {
   const [filters, setFilters] = useState({
     status: '',
     assigned_to: '',
+    search: '',
   });
 
   const { data: tasks, isLoading, error } = useQuery(
     ['tasks', filters],
     () => {
       // Limpiar filtros vacíos para evitar errores 422
-      const cleanFilters = {};
+      // La lista muestra la descripción, que la API solo envía si se pide
+      const cleanFilters = { include: 'description' };
       if (filters.status && filters.status !== '') {
         cleanFilters.status = filters.status;
       }
       if (filters.assigned_to && filters.assigned_to !== '') {
         cleanFilters.assigned_to = parseInt(filters.assigned_to);
       }
+      // Con texto de búsqueda se usa la búsqueda de texto completo del servidor
+      if (filters.search && filters.search.trim() !== '') {
+        return taskService.search(filters.search.trim(), cleanFilters);
+      }
       return taskService.getAll(cleanFilters);
     },
     {
@@ -155,6 +161,17 @@ function Tasks() {
           <h3 className="card-title">Filtros</h3>
         </div>
         <div style={{ display: 'flex', gap: '16px', flexWrap: 'wrap' }}>
+          <div className="form-group" style={{ marginBottom: 0, minWidth: '260px' }}>
+            <label className="form-label">Buscar</label>
+            <input
+              type="text"
+              className="form-control"
+              placeholder="Título, descripción, programa, ciudad..."
+              value={filters.search}
+              onChange={(e) => handleFilterChange('search', e.target.value)}
+            />
+          </div>
+          
           <div className="form-group" style={{ marginBottom: 0, minWidth: '200px' }}>
             <label className="form-label">Estado</label>
             <select
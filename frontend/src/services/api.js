@@ -44,6 +44,9 @@ export const taskService = {
   getAll: (params = {}) => {
     return api.get('/api/v1/tasks', { params });
   },
+  search: (q, params = {}) => {
+    return api.get('/api/v1/tasks/search', { params: { q, ...params } });
+  },
   getById: (id) => api.get(`/api/v1/tasks/${id}`),
   create: (data) => api.post('/api/v1/tasks', data),
   update: (id, data) => api.put(`/api/v1/tasks/${id}`, data),